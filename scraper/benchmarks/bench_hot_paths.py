@@ -0,0 +1,203 @@
+"""
+bench_hot_paths.py
+Offline benchmarks for the ingest and classification hot paths, on the
+synthetic EN/DE corpus from corpus.py:
+
+    strip_html, matches_keywords, get_identity_tags, get_system_topics,
+    detect_paywall, story_lookup (simhash + StoryIndex find / add),
+    sqlite_insert (write_articles), recategorize
+
+Each (benchmark, size) runs in a fresh interpreter so throughput and peak
+memory (max RSS) are not skewed by earlier runs. Only the measured calls are
+timed; corpus generation is not.
+
+    python scraper/benchmarks/bench_hot_paths.py --sizes 1000,100000 --save baseline.json
+    python scraper/benchmarks/bench_hot_paths.py --sizes 1000,100000 --compare baseline.json
+
+--compare exits 1 if any throughput drops, or peak memory grows, by more
+than --threshold (default 10%).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:     # Windows: no peak-RSS figure
+    resource = None
+
+from corpus import article_rows, generate_entries, scraper, write_run
+
+BENCHMARKS    = ("strip_html", "matches_keywords", "get_identity_tags", "get_system_topics",
+                 "detect_paywall", "story_lookup", "sqlite_insert", "recategorize")
+DEFAULT_SIZES = "1000,100000,1000000"
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return 0.0
+    # ru_maxrss is KB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _timed_calls(size, call):
+    """Run call(entry) over the corpus; return seconds spent inside call."""
+    elapsed = 0.0
+    for chunk in generate_entries(size):
+        start = time.perf_counter()
+        for entry in chunk:
+            call(entry)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def _story_lookup(entry, index):
+    signature = scraper.simhash(scraper.normalize_entry(entry).match)
+    if signature is not None:
+        story_id = index.find(signature)
+        index.add(signature, signature if story_id is None else story_id)
+
+
+def _insert(size, path):
+    """Store the corpus through write_articles; return seconds spent writing."""
+    scraper.DB_FILE = path
+    scraper.setup_database()
+    run     = write_run(scraper.get_connection())
+    elapsed = 0.0
+    for chunk in generate_entries(size):
+        rows  = article_rows(chunk, taxonomy_version="")
+        start = time.perf_counter()
+        scraper.write_articles(rows, "benchmark", run)
+        elapsed += time.perf_counter() - start
+    start = time.perf_counter()
+    run["conn"].commit()
+    elapsed += time.perf_counter() - start
+    run["conn"].close()
+    return elapsed
+
+
+def run_one(name, size):
+    """Run one benchmark in this process; return its result dict."""
+    scraper.USE_SUPABASE = scraper.USE_POSTGRES = False
+    scraper.ARTICLE_CACHE_SIZE = 0
+    # Build the per-locale automata up front so the first timed call doesn't pay for it
+    for locale in scraper.LOCALE_TABLES:
+        scraper._tables(locale)
+    rss_before = _peak_rss_mb()
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        path = os.path.join(tmp, "bench.db")
+        if name == "strip_html":
+            seconds = _timed_calls(size, lambda e: scraper.strip_html(e["summary"]))
+        elif name == "matches_keywords":
+            seconds = _timed_calls(size, lambda e: scraper.matches_keywords(
+                e["title"], e["summary"], e["locale"]))
+        elif name == "get_identity_tags":
+            seconds = _timed_calls(size, lambda e: scraper.get_identity_tags(
+                e["title"] + " " + e["summary"], e["source"], e["locale"]))
+        elif name == "get_system_topics":
+            seconds = _timed_calls(size, lambda e: scraper.get_system_topics(
+                e["title"] + " " + e["summary"], e["source"], e["locale"]))
+        elif name == "detect_paywall":
+            seconds = _timed_calls(size, lambda e: scraper.detect_paywall(
+                e, e["source"], e["locale"]))
+        elif name == "story_lookup":
+            index   = scraper.StoryIndex()
+            seconds = _timed_calls(size, lambda e: _story_lookup(e, index))
+        elif name == "sqlite_insert":
+            seconds = _insert(size, path)
+        elif name == "recategorize":
+            _insert(size, path)
+            seconds = scraper.recategorize_all_articles(force=True)["seconds"]
+        else:
+            raise ValueError(f"unknown benchmark {name!r}")
+
+    peak = _peak_rss_mb()
+    return {"size": size, "seconds": round(seconds, 4),
+            "per_s": round(size / seconds, 1) if seconds else 0.0,
+            "peak_mb": round(peak, 1), "extra_mb": round(peak - rss_before, 1)}
+
+
+def run_isolated(name, size):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--single", name, str(size)],
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Print the deltas against baseline; return the list of regressions."""
+    regressions = []
+    for key, now in results.items():
+        before = baseline.get("results", {}).get(key)
+        if not before:
+            print(f"  {key:32s} (not in baseline)")
+            continue
+        speed = now["per_s"] / before["per_s"] - 1 if before["per_s"] else 0.0
+        mem   = now["peak_mb"] / before["peak_mb"] - 1 if before["peak_mb"] else 0.0
+        flags = []
+        if speed < -threshold:
+            flags.append("SLOWER")
+        if mem > threshold:
+            flags.append("MORE MEMORY")
+        if flags:
+            regressions.append(key)
+        print(f"  {key:32s} throughput {speed:+7.1%}   peak memory {mem:+7.1%}   {' '.join(flags)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated corpus sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--only", default=",".join(BENCHMARKS),
+                        help="comma-separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--save", metavar="FILE", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change counted as a regression (default 0.10)")
+    parser.add_argument("--single", nargs=2, metavar=("NAME", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_one(args.single[0], int(args.single[1]))))
+        return
+
+    sizes   = [int(size) for size in args.sizes.split(",")]
+    names   = [name.strip() for name in args.only.split(",")]
+    results = {}
+    for name in names:
+        for size in sizes:
+            result = results[f"{name}@{size}"] = run_isolated(name, size)
+            print(f"{name:18s} {size:>9,d}  {result['per_s']:>12,.0f} entries/s  "
+                  f"{result['seconds']:8.2f}s  peak {result['peak_mb']:7.1f} MB "
+                  f"(+{result['extra_mb']:.1f})", flush=True)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"python": platform.python_version(), "platform": platform.platform(),
+                       "taxonomy_version": scraper.TAXONOMY_VERSION, "results": results},
+                      f, indent=2, sort_keys=True)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions.")
+
+
+if __name__ == "__main__":
+    main()
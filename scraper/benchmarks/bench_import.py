@@ -0,0 +1,79 @@
+"""
+bench_import.py
+Import-time budget for scraper_UPDATED: runs `python -X importtime -c
+"import scraper_UPDATED"` in fresh interpreters (bytecode compiled first, so
+this is the warm import an API worker or CLI pays) and checks that
+
+  - the median cumulative import time stays under --budget-ms, and
+  - none of the lazily imported heavy modules (feedparser, urllib.request,
+    executors, XML parser, asyncio, zstandard, DB drivers, Supabase client)
+    are pulled in.
+
+    python scraper/benchmarks/bench_import.py --budget-ms 60
+
+Exits 1 when either check fails, so it can gate CI.
+"""
+
+import argparse
+import os
+import py_compile
+import statistics
+import subprocess
+import sys
+
+SCRAPER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE      = "scraper_UPDATED"
+
+# Imported on first use inside the module, never at import time
+LAZY_MODULES = ("feedparser", "urllib.request", "concurrent.futures", "xml.etree.ElementTree",
+                "gzip", "asyncio", "zstandard", "supabase", "pg8000", "psycopg2")
+
+
+def import_profile():
+    """One fresh-interpreter import; return {module: cumulative µs}."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {MODULE}"],
+                         cwd=SCRAPER_DIR, capture_output=True, text=True, check=True)
+    profile = {}
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--budget-ms", type=float, default=60.0,
+                        help="maximum median cumulative import time (default 60)")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+
+    py_compile.compile(os.path.join(SCRAPER_DIR, f"{MODULE}.py"))
+    profiles = [import_profile() for _ in range(max(1, args.runs))]
+    totals   = sorted(profile[MODULE] for profile in profiles)
+    median   = statistics.median(totals)
+    profile  = next(p for p in profiles if p[MODULE] == totals[len(totals) // 2])
+
+    print(f"{MODULE}: median {median / 1000:.1f} ms over {len(totals)} runs "
+          f"(min {totals[0] / 1000:.1f}, max {totals[-1] / 1000:.1f}); budget {args.budget_ms:.0f} ms")
+    print("slowest imports (cumulative):")
+    for name, micros in sorted(profile.items(), key=lambda item: -item[1])[1:args.top + 1]:
+        print(f"  {micros / 1000:7.1f} ms  {name}")
+
+    eager  = [name for name in LAZY_MODULES if name in profile]
+    failed = False
+    if eager:
+        print(f"❌ imported eagerly: {', '.join(eager)}")
+        failed = True
+    if median / 1000 > args.budget_ms:
+        print(f"❌ over budget by {median / 1000 - args.budget_ms:.1f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+bench_sqlite_ingest.py
+SQLite ingest benchmark — the legacy path (new connection per source, one
+INSERT per row, duplicates caught as UNIQUE-constraint exceptions, default
+pragmas) against the batched path used by scrape_all_feeds (one tuned
+connection, executemany + INSERT OR IGNORE, commit every SQLITE_COMMIT_ROWS).
+
+Runs fully offline on a synthetic corpus in temporary database files:
+
+    python scraper/benchmarks/bench_sqlite_ingest.py --rows 20000 --sources 60
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from corpus import article_rows, generate_entries, scraper, write_run
+
+
+def synthetic_rows(n_rows, n_sources, dup_ratio, seed=42):
+    """Return {source: [row dicts]} from the corpus, with roughly dup_ratio repeated links."""
+    rng     = random.Random(seed)
+    sources = [f"Source {i}" for i in range(n_sources)]
+    by_src  = {name: [] for name in sources}
+    seen    = []
+    for chunk in generate_entries(n_rows, seed=seed):
+        for entry in chunk:
+            if seen and rng.random() < dup_ratio:
+                entry["link"] = rng.choice(seen)
+            else:
+                seen.append(entry["link"])
+            entry["source"] = rng.choice(sources)
+        for row in article_rows(chunk):
+            by_src[row["source"]].append(row)
+    return by_src
+
+
+def _fresh_db(path, legacy):
+    scraper.DB_FILE = path
+    scraper.setup_database()
+    if legacy:
+        # The legacy path ran with SQLite's default rollback journal
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.close()
+
+
+def ingest_legacy(path, by_src):
+    columns  = ", ".join(scraper.ARTICLE_COLUMNS)
+    marks    = ", ".join(["?"] * len(scraper.ARTICLE_COLUMNS))
+    inserted = 0
+    for rows in by_src.values():
+        conn   = sqlite3.connect(path)
+        cursor = conn.cursor()
+        for row in rows:
+            try:
+                cursor.execute(f"INSERT INTO articles ({columns}) VALUES ({marks})",
+                               tuple(row[col] for col in scraper.ARTICLE_COLUMNS))
+                inserted += 1
+            except sqlite3.IntegrityError:
+                pass
+        conn.commit()
+        conn.close()
+    return inserted
+
+
+def ingest_batched(path, by_src):
+    scraper.DB_FILE = path
+    run      = write_run(scraper.get_connection())
+    inserted = 0
+    for source, rows in by_src.items():
+        inserted += scraper.write_articles(rows, source, run)
+    run["conn"].commit()
+    run["conn"].close()
+    return inserted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--rows",      type=int,   default=20000)
+    parser.add_argument("--sources",   type=int,   default=60)
+    parser.add_argument("--dup-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    scraper.USE_SUPABASE = scraper.USE_POSTGRES = False
+    by_src = synthetic_rows(args.rows, args.sources, args.dup_ratio)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for name, ingest, legacy in (("legacy", ingest_legacy, True),
+                                     ("batched", ingest_batched, False)):
+            path = os.path.join(tmp, f"{name}.db")
+            _fresh_db(path, legacy)
+            start    = time.perf_counter()
+            inserted = ingest(path, by_src)
+            elapsed  = time.perf_counter() - start
+            results[name] = elapsed
+            print(f"{name:8s} {inserted:7d} rows inserted in {elapsed:7.3f}s "
+                  f"({args.rows / elapsed:10.0f} rows/s)")
+
+    print(f"speed-up  {results['legacy'] / results['batched']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+check_parity.py
+Parity check for the classification engine: classify_entry (one automaton
+pass per entry) against the legacy per-function path, re-implemented here
+as plain substring scans over the same normalized text, on the synthetic
+EN/DE corpus from corpus.py. Compares the inclusion gate, identity tags,
+system topics and paywall flag for every entry.
+
+    python scraper/benchmarks/check_parity.py --size 20000
+
+Exits 1 on any difference, listing the first few, so it can gate CI.
+"""
+
+import argparse
+import sys
+
+from corpus import generate_entries, scraper
+
+
+def legacy_classify(entry, source, locale):
+    """Gate / identity / topics / paywall the way the per-function code did it."""
+    de      = locale == "de"
+    title   = scraper.strip_html(entry.get("title", "No title"))
+    summary = scraper.strip_html(entry.get("summary", ""))
+    text    = scraper.match_string(f"{title} {summary}")
+
+    def hit(keywords):
+        return any(scraper.match_string(kw) in text for kw in keywords)
+
+    identity = scraper.IDENTITY_TERMS_DE if de else scraper.IDENTITY_TERMS
+    tags = set()
+    if source in (scraper.DE_FEMINIST_SOURCES if de else scraper.FEMINIST_SOURCES) \
+            or hit(identity["women"]):
+        tags.add("women")
+    if source in (scraper.DE_LGBTQIA_SOURCES if de else scraper.LGBTQIA_SOURCES) \
+            or hit(identity["lgbtqia+"]):
+        tags.add("lgbtqia+")
+
+    topics = [name for name, keywords in
+              (scraper.TOPIC_KEYWORDS_DE if de else scraper.TOPIC_KEYWORDS).items() if hit(keywords)][:3]
+    default_topic = scraper.SOURCE_DEFAULT_TOPIC_DE if de else scraper.SOURCE_DEFAULT_TOPIC
+    if not topics and source in default_topic:
+        topics = [default_topic[source]]
+
+    paywalled = (source in scraper.PAYWALLED_SOURCES
+                 or hit(scraper.PAYWALL_SIGNAL_PHRASES_DE if de else scraper.PAYWALL_SIGNAL_PHRASES)
+                 or (source not in scraper.ALL_ALWAYS_INCLUDE_SOURCES and 0 < len(summary) < 120))
+    return {
+        "keep":          source in scraper.ALL_ALWAYS_INCLUDE_SOURCES
+                         or hit(scraper.KEYWORDS_DE if de else scraper.KEYWORDS),
+        "identity_tags": sorted(tags),
+        "system_topics": topics,
+        "is_paywalled":  paywalled,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--size", type=int, default=20000, help="corpus entries (default 20000)")
+    parser.add_argument("--show", type=int, default=10, help="differences to print")
+    args = parser.parse_args()
+
+    checked, diffs = 0, []
+    for chunk in generate_entries(args.size):
+        for entry in chunk:
+            checked += 1
+            new = scraper.classify_entry(entry, entry["source"], entry["locale"])
+            old = legacy_classify(entry, entry["source"], entry["locale"])
+            for field, value in old.items():
+                if new[field] != value:
+                    diffs.append((entry["source"], entry["title"][:60], field, value, new[field]))
+
+    print(f"{checked:,d} entries checked, {len(diffs)} difference(s).")
+    for source, title, field, old, new in diffs[:args.show]:
+        print(f"  {source}: {title!r} {field}: legacy {old!r} → engine {new!r}")
+    if diffs:
+        sys.exit(1)
+    print("✅ classify_entry matches the per-function path.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+check_regressions.py
+Offline regression checks for the storage and query paths, each on a fresh
+temporary SQLite database filled from the synthetic corpus (corpus.py):
+
+    cache_filters   get_all_articles: whitespace / case variants of a filter
+                    never share a cache entry with a different query
+    rekey_stats     rekey_articles: a merged duplicate's paywall_override
+                    carried to the kept row shows up in article_stats
+    failed_source   write_articles (SQLite): a source that fails mid-write
+                    leaves no rows, topic rows or rollup counts behind
+
+    python scraper/benchmarks/check_regressions.py
+    python scraper/benchmarks/check_regressions.py --only cache_filters
+
+Exits 1 if any check fails, so it can gate CI.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import traceback
+
+from corpus import article_rows, generate_entries, scraper, write_run
+
+
+def _fresh_db(tmp, entries=500):
+    """Point the scraper at a new SQLite file in tmp, with `entries` corpus rows stored."""
+    scraper.USE_SUPABASE = scraper.USE_POSTGRES = False
+    scraper.DB_FILE = os.path.join(tmp, "check.db")
+    scraper.setup_database()
+    run = write_run(scraper.get_connection())
+    for chunk in generate_entries(entries):
+        scraper.write_articles(article_rows(chunk), "corpus", run)
+    run["conn"].commit()
+    run["conn"].close()
+    scraper.bump_scrape_generation()
+
+
+def check_cache_filters(tmp):
+    _fresh_db(tmp)
+    scraper.ARTICLE_CACHE_SIZE = 256
+    source = next(row["source"] for row in scraper.get_all_articles(limit=1))
+    exact  = scraper.get_all_articles(source=source, limit=30)
+    assert exact, f"no rows for {source!r}"
+
+    # Whitespace variants are the same query, whichever runs first
+    scraper.bump_scrape_generation()
+    padded = scraper.get_all_articles(source=f" {source} ", limit=30)
+    assert padded == exact, "padded source returned different rows"
+    assert scraper.get_all_articles(source=source, limit=30) == exact, \
+        "exact source served a padded query's cache entry with different rows"
+
+    # Case variants are different queries (source is matched exactly)
+    scraper.bump_scrape_generation()
+    upper = scraper.get_all_articles(source=source.upper(), limit=30)
+    assert scraper.get_all_articles(source=source, limit=30) == exact, \
+        "exact source served the upper-case query's cache entry"
+    assert upper == ([] if source.upper() != source else exact)
+
+    # Blank filters mean "no filter"
+    assert scraper.get_all_articles(source="  ", limit=30) == scraper.get_all_articles(limit=30)
+
+
+def _stats_rows(cursor):
+    cursor.execute("SELECT day, dimension, value, articles, paywalled FROM article_stats "
+                   "ORDER BY day, dimension, value")
+    return cursor.fetchall()
+
+
+def check_rekey_stats(tmp):
+    _fresh_db(tmp, entries=50)
+    # Two spellings of one link stored under different (pre-canonical) keys;
+    # only the later duplicate carries a reader's paywall override
+    links = ("https://www.bbc.co.uk/news/a", "http://bbc.co.uk/news/a/?at_medium=RSS")
+    rows  = article_rows([{"title": "Duplicate story", "summary": "women " * 40, "link": link,
+                           "source": "BBC News", "locale": "en"} for link in links])
+    rows[1]["url_hash"] = b"\x00" * 16
+    conn = scraper.get_connection()
+    scraper.write_articles(rows, "BBC News", write_run(conn))
+    conn.execute("UPDATE articles SET paywall_override = 1 WHERE url_hash = ?", [b"\x00" * 16])
+    conn.commit()
+    assert scraper.rebuild_article_stats(verify=True)
+
+    result = scraper.rekey_articles()
+    assert result["merged"] == 1, result
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM articles WHERE paywall_override = 1")
+    assert cursor.fetchone()[0] == 1, "override not carried to the kept row"
+    incremental = _stats_rows(cursor)
+    assert scraper.rebuild_article_stats(verify=True)
+    assert incremental == _stats_rows(cursor), "article_stats drifted from a full rebuild"
+    conn.close()
+
+
+def check_failed_source(tmp):
+    _fresh_db(tmp, entries=50)
+    conn   = scraper.get_connection()
+    run    = write_run(conn)
+    cursor = conn.cursor()
+    chunks = generate_entries(300, seed=7, chunk_size=100)
+    scraper.write_articles(article_rows(next(chunks)), "first", run)   # stays pending
+
+    # Fail after the insert, while the rollup is being updated
+    apply_stats = scraper.apply_article_stats
+    def failing_stats(*args, **kwargs):
+        raise RuntimeError("simulated failure")
+    scraper.apply_article_stats = failing_stats
+    try:
+        scraper.write_articles(article_rows(next(chunks)), "failing", run)
+        raise AssertionError("write_articles did not raise")
+    except RuntimeError:
+        pass
+    finally:
+        scraper.apply_article_stats = apply_stats
+    scraper.write_articles(article_rows(next(chunks)), "third", run)
+    conn.commit()
+
+    cursor.execute("SELECT COUNT(*) FROM articles")
+    assert cursor.fetchone()[0] == 250, "failed source left rows behind (or a good one lost its rows)"
+    cursor.execute("SELECT COUNT(*) FROM article_topics WHERE article_id NOT IN (SELECT id FROM articles)")
+    assert cursor.fetchone()[0] == 0, "orphaned article_topics rows"
+    incremental = _stats_rows(cursor)
+    assert scraper.rebuild_article_stats(verify=True)
+    assert incremental == _stats_rows(cursor), "article_stats drifted from a full rebuild"
+    conn.close()
+
+
+CHECKS = {
+    "cache_filters": check_cache_filters,
+    "rekey_stats":   check_rekey_stats,
+    "failed_source": check_failed_source,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[2])
+    parser.add_argument("--only", default=",".join(CHECKS),
+                        help="comma-separated subset of: " + ", ".join(CHECKS))
+    args = parser.parse_args()
+
+    failed = []
+    for name in (name.strip() for name in args.only.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    CHECKS[name](tmp)
+            except Exception:
+                failed.append(name)
+                print(f"❌ {name}")
+                traceback.print_exc()
+                continue
+        print(f"✅ {name}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+corpus.py
+Synthetic RSS corpus for the offline benchmarks: English and German entries
+with HTML markup, drawn from the scraper's own keyword tables at realistic
+rates (most entries hit nothing, some hit the gate, topics and identity
+terms, a few carry paywall phrases).
+
+Entries are generated lazily in chunks, so a 1M-entry run never holds the
+whole corpus in memory. article_rows() turns entries into the row dicts
+write_articles stores.
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import scraper_UPDATED as scraper  # noqa: E402
+
+FILLER_EN = (
+    "the a of in on for with after says new report government minister week "
+    "people city country official year plan group local national statement "
+    "over under talks vote court police health school workers data public"
+).split()
+FILLER_DE = (
+    "der die das und in mit nach für neue bericht regierung ministerin woche "
+    "menschen stadt land sprecher jahr plan gruppe lokal bundesweit erklärung "
+    "über unter gespräche abstimmung gericht polizei gesundheit schule daten"
+).split()
+
+MARKUP = ('<p>{}</p>', '<p><a href="https://example.org/x">{}</a></p>',
+          '{} &amp; more', '<div class="lede"><b>{}</b></div>', '{}')
+
+# Share of entries with keyword hits; the rest are pure filler (like most
+# general-news items the gate rejects)
+HIT_RATE     = 0.35
+PAYWALL_RATE = 0.05
+
+
+def _vocab(locale):
+    de = locale == "de"
+    topics   = scraper.TOPIC_KEYWORDS_DE if de else scraper.TOPIC_KEYWORDS
+    identity = scraper.IDENTITY_TERMS_DE if de else scraper.IDENTITY_TERMS
+    return {
+        "filler":   FILLER_DE if de else FILLER_EN,
+        "gate":     scraper.KEYWORDS_DE if de else scraper.KEYWORDS,
+        "topic":    [kw for kws in topics.values() for kw in kws],
+        "identity": [kw for kws in identity.values() for kw in kws],
+        "paywall":  scraper.PAYWALL_SIGNAL_PHRASES_DE if de else scraper.PAYWALL_SIGNAL_PHRASES,
+        "sources":  [name for name, info in scraper.FEEDS.items()
+                     if (info.get("locale", "en") == "de") == de],
+    }
+
+
+def _text(rng, vocab, words, hits):
+    out = [rng.choice(vocab["filler"]) for _ in range(words)]
+    for kind in hits:
+        out.insert(rng.randrange(len(out) + 1), rng.choice(vocab[kind]))
+    return " ".join(out)
+
+
+def generate_entries(n, seed=42, de_ratio=0.4, chunk_size=10000):
+    """Yield lists of up to chunk_size entry dicts (title, summary, link, source, locale)."""
+    rng    = random.Random(seed)
+    vocabs = {"en": _vocab("en"), "de": _vocab("de")}
+    chunk  = []
+    for i in range(n):
+        locale = "de" if rng.random() < de_ratio else "en"
+        vocab  = vocabs[locale]
+        hits   = []
+        if rng.random() < HIT_RATE:
+            hits = rng.sample(["gate", "topic", "topic", "identity"], rng.randint(1, 3))
+        summary_hits = [h for h in hits if rng.random() < 0.6]
+        if rng.random() < PAYWALL_RATE:
+            summary_hits.append("paywall")
+        chunk.append({
+            "title":   _text(rng, vocab, rng.randint(6, 12), [h for h in hits if h not in summary_hits]),
+            "summary": rng.choice(MARKUP).format(_text(rng, vocab, rng.randint(20, 60), summary_hits)),
+            "link":    f"https://example.org/{locale}/{seed}/{i}",
+            "source":  rng.choice(vocab["sources"]),
+            "locale":  locale,
+        })
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def article_rows(entries, taxonomy_version=None):
+    """
+    write_articles row dicts for corpus entries, with a fixed classification
+    (women / State Power) and no story, so storage benchmarks and checks
+    don't depend on the classifiers.
+    """
+    now  = datetime.now(timezone.utc).isoformat()
+    mask = scraper.topic_mask(["State Power, Law & Governance", "women"])
+    return [{
+        "url_hash": scraper.url_hash(entry["link"]), "title": entry["title"],
+        "link": entry["link"], "summary": entry["summary"], "source": entry["source"],
+        "country": "DE" if entry["locale"] == "de" else "US", "category": "women",
+        "tags": "women", "topics": "State Power, Law & Governance", "scraped_at": now,
+        "published_at": "", "is_paywalled": False, "locale": entry["locale"],
+        "taxonomy_version": scraper.TAXONOMY_VERSION if taxonomy_version is None else taxonomy_version,
+        "topic_mask": mask, "simhash": None, "story_id": None,
+    } for entry in entries]
+
+
+def write_run(conn):
+    """The minimal run dict write_articles needs: a connection and a pending-row count."""
+    return {"conn": conn, "pending": 0}
@@ -6,11 +6,25 @@ Uses a systems-of-power taxonomy with 9 primary system categories.
 Supports Supabase (production), SQLite (local dev fallback).
 """
 
-import feedparser
+# Imports are kept light: feedparser, urllib.request, the XML parser, the
+# executors and the database drivers / Supabase client are imported where
+# they are first needed, so importing this module for get_all_articles or the
+# classifiers stays cheap (see benchmarks/bench_import.py for the budget).
 import sqlite3
+import functools
 import hashlib
+import html
+import importlib.util
+import json
 import re
 import os
+import random
+import threading
+import time
+import unicodedata
+import urllib.parse
+import zlib
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
 
 # ── Supabase (primary — used when SUPABASE_URL + SUPABASE_SERVICE_ROLE_KEY set) ─
@@ -18,43 +32,123 @@ SUPABASE_URL          = os.environ.get("SUPABASE_URL", "")
 SUPABASE_SERVICE_KEY  = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", "")
 USE_SUPABASE          = bool(SUPABASE_URL and SUPABASE_SERVICE_KEY)
 
-_supabase = None
-if USE_SUPABASE:
-    try:
-        from supabase import create_client
-        _supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-        print("✅  Supabase client initialised.", flush=True)
-    except ImportError:
-        print("⚠️  supabase-py not installed. Falling back to SQLite.", flush=True)
-        USE_SUPABASE = False
+# Backend selection only checks that the packages are installed; the client
+# and drivers are created on first use (_supabase_client(), get_connection()).
+if USE_SUPABASE and importlib.util.find_spec("supabase") is None:
+    print("⚠️  supabase-py not installed. Falling back to SQLite.", flush=True)
+    USE_SUPABASE = False
 
 # ── Postgres legacy support (only if DATABASE_URL set and Supabase not available)
 DATABASE_URL = os.environ.get("DATABASE_URL", "")
 USE_POSTGRES = bool(DATABASE_URL) and not USE_SUPABASE
 
+_DRIVER = None
 if USE_POSTGRES:
-    try:
-        import pg8000.dbapi as _pg8000_dbapi
-        _DRIVER = "pg8000"
-    except ImportError:
-        try:
-            import psycopg2
-            _DRIVER = "psycopg2"
-        except ImportError:
-            _DRIVER = None
-            USE_POSTGRES = False
-else:
-    _DRIVER = None
+    _DRIVER = next((name for name in ("pg8000", "psycopg2")
+                    if importlib.util.find_spec(name) is not None), None)
+    USE_POSTGRES = _DRIVER is not None
 
 DB_FILE = "news.db"
+# Applied to every SQLite connection: WAL lets readers run during a scrape and
+# makes NORMAL sync safe (fsync at checkpoints, not per commit); ~20 MB cache.
+SQLITE_PRAGMAS = (
+    "journal_mode = WAL",
+    "synchronous = NORMAL",
+    "cache_size = -20000",
+    "temp_store = MEMORY",
+)
 MAX_ARTICLES_PER_SOURCE = 30
+RETENTION_DAYS = 30
+
+# Rows per batch wherever a statement binds one parameter per id (IN lists).
+# SQLite builds before 3.32 allow only 999 host parameters per statement.
+ID_BATCH = 1000 if sqlite3.sqlite_version_info >= (3, 32, 0) else 998
+
+# Retention purge deletes RETENTION_CHUNK rows per transaction (oldest first,
+# via idx_articles_scraped). With SCRAPER_ARCHIVE_DIR set, expired rows are
+# first appended to <dir>/articles-YYYY-MM-DD.jsonl.gz (.zst with
+# SCRAPER_ARCHIVE_FORMAT=zstd and the zstandard package installed).
+RETENTION_CHUNK = ID_BATCH
+ARCHIVE_DIR     = os.environ.get("SCRAPER_ARCHIVE_DIR", "")
+ARCHIVE_FORMAT  = os.environ.get("SCRAPER_ARCHIVE_FORMAT", "gzip")
+
+# Postgres: connect retries back off exponentially (base · 2^attempt, capped)
+# with full jitter; idle connections are pooled and reused for the whole run.
+PG_CONNECT_ATTEMPTS = 5
+PG_BACKOFF_BASE     = 1.0
+PG_BACKOFF_CAP      = 30.0
+PG_POOL_SIZE        = 2
+PG_PING_AFTER       = 30.0    # seconds idle before a pooled connection is checked
+PG_INSERT_CHUNK     = 500
+
+# Concurrent fetching: global cap on in-flight feed requests, plus a per-host
+# cap so sources sharing a host (BBC, Reuters, Guardian) are fetched in turn.
+FETCH_WORKERS  = int(os.environ.get("SCRAPER_FETCH_WORKERS", "8"))
+FETCH_PER_HOST = int(os.environ.get("SCRAPER_FETCH_PER_HOST", "1"))
+FETCH_TIMEOUT  = 30
+USER_AGENT     = "Mozilla/5.0 (compatible; shared-ground-scraper/1.0)"
+
+# RSS 2.0 / Atom feeds are parsed incrementally while downloading and the
+# response is dropped once MAX_ARTICLES_PER_SOURCE entries are in; other
+# formats and malformed XML go to feedparser. SCRAPER_STREAM_FEEDS=0 turns
+# the streaming parser off.
+STREAM_FEEDS = os.environ.get("SCRAPER_STREAM_FEEDS", "1") != "0"
+STREAM_CHUNK = 64 * 1024
+
+# Adaptive polling: each feed's next fetch is scheduled from its estimated
+# entry rate so that about POLL_TARGET_FILL of MAX_ARTICLES_PER_SOURCE is new
+# by then, within [POLL_MIN_HOURS, POLL_MAX_HOURS]. A run fetches only the
+# feeds due by now + POLL_SLACK (scheduled jobs start a few minutes late).
+POLL_MIN_HOURS   = float(os.environ.get("SCRAPER_POLL_MIN_HOURS", "1"))
+POLL_MAX_HOURS   = float(os.environ.get("SCRAPER_POLL_MAX_HOURS", "24"))
+POLL_TARGET_FILL = 0.5
+POLL_SLACK       = timedelta(minutes=10)
+RATE_SMOOTHING   = 0.5      # weight of the newest rate estimate (EWMA)
+
+# --serve: where the health / metrics endpoint listens (local only by
+# default) and how often the daemon runs the retention purge.
+SERVE_HOST            = os.environ.get("SCRAPER_SERVE_HOST", "127.0.0.1")
+SERVE_PORT            = int(os.environ.get("SCRAPER_SERVE_PORT", "8787"))
+RETENTION_EVERY_HOURS = float(os.environ.get("SCRAPER_RETENTION_EVERY_HOURS", "6"))
+
+# Run metrics: JSON lines appended per run, and a Prometheus text file
+# rewritten per run (point node_exporter's textfile collector at its dir).
+METRICS_FILE    = os.environ.get("SCRAPER_METRICS_FILE", "")
+PROMETHEUS_FILE = os.environ.get("SCRAPER_PROMETHEUS_FILE", "")
+
+# get_all_articles read cache: LRU of recent queries, dropped whenever a scrape
+# or recategorization commits; the TTL bounds staleness when another process
+# (e.g. the scheduled scraper) is the one writing.
+ARTICLE_CACHE_SIZE = int(os.environ.get("SCRAPER_ARTICLE_CACHE_SIZE", "256"))
+ARTICLE_CACHE_TTL  = float(os.environ.get("SCRAPER_ARTICLE_CACHE_TTL", "900"))
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  DATABASE CONNECTION
 # ─────────────────────────────────────────────────────────────────────────────
+_supabase      = None
+_supabase_lock = threading.Lock()
+
+
+def backend_name():
+    """The backend this process writes to: "supabase", "postgres" or "sqlite"."""
+    return "supabase" if USE_SUPABASE else "postgres" if USE_POSTGRES else "sqlite"
+
+
+def _supabase_client():
+    """Create the Supabase client on first use (one per process)."""
+    global _supabase
+    with _supabase_lock:
+        if _supabase is None:
+            from supabase import create_client
+            _supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+            print("✅  Supabase client initialised.", flush=True)
+        return _supabase
+
+
 def get_connection():
+    """Open a new connection. Prefer acquire_connection() for Postgres."""
     if USE_POSTGRES:
-        import urllib.parse, time, ssl
+        import ssl
         parsed = urllib.parse.urlparse(DATABASE_URL)
         host     = parsed.hostname
         port     = parsed.port or 5432
@@ -63,9 +157,10 @@ def get_connection():
         password = parsed.password
         last_err = None
 
-        for attempt in range(3):
+        for attempt in range(PG_CONNECT_ATTEMPTS):
             try:
                 if _DRIVER == "pg8000":
+                    import pg8000.dbapi as _pg8000_dbapi
                     ssl_ctx = ssl.create_default_context()
                     ssl_ctx.check_hostname = False
                     ssl_ctx.verify_mode = ssl.CERT_NONE
@@ -81,6 +176,7 @@ def get_connection():
                         url += ("&" if "?" in url else "?") + "sslmode=require"
                     conn = _psycopg3.connect(url)
                 else:  # psycopg2
+                    import psycopg2
                     conn = psycopg2.connect(
                         host=host, port=port, dbname=dbname,
                         user=user, password=password,
@@ -91,10 +187,79 @@ def get_connection():
             except Exception as e:
                 last_err = e
                 print(f"  ⚠️  DB connection attempt {attempt+1} ({_DRIVER}) failed: {e}", flush=True)
-                if attempt < 2:
-                    time.sleep(5)
+                if attempt < PG_CONNECT_ATTEMPTS - 1:
+                    time.sleep(random.uniform(0, min(PG_BACKOFF_CAP, PG_BACKOFF_BASE * 2 ** attempt)))
         raise last_err
-    return sqlite3.connect(DB_FILE)
+
+    conn = sqlite3.connect(DB_FILE)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(f"PRAGMA {pragma}")
+    return conn
+
+
+_pg_pool      = []     # (connection, monotonic time it was released)
+_pg_pool_lock = threading.Lock()
+
+
+def _connection_alive(conn):
+    # Server idle timeouts and restarts close pooled connections silently
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def acquire_connection():
+    """
+    Return a connection, reusing an idle pooled one on Postgres so a run does
+    a handful of TLS handshakes instead of one per source. A connection idle
+    for more than PG_PING_AFTER seconds is pinged first and replaced if dead.
+    SQLite connections are cheap and thread-bound, so they are always opened
+    fresh.
+    """
+    while USE_POSTGRES:
+        with _pg_pool_lock:
+            if not _pg_pool:
+                break
+            conn, released = _pg_pool.pop()
+        if time.monotonic() - released < PG_PING_AFTER or _connection_alive(conn):
+            return conn
+        try:
+            conn.close()
+        except Exception:
+            pass
+    return get_connection()
+
+
+def release_connection(conn):
+    """Hand a connection from acquire_connection() back (rolled back, pooled or closed)."""
+    if USE_POSTGRES:
+        try:
+            conn.rollback()
+            with _pg_pool_lock:
+                if len(_pg_pool) < PG_POOL_SIZE:
+                    _pg_pool.append((conn, time.monotonic()))
+                    return
+        except Exception:
+            pass
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def close_pool():
+    """Close every idle pooled connection (end of process)."""
+    with _pg_pool_lock:
+        while _pg_pool:
+            try:
+                _pg_pool.pop()[0].close()
+            except Exception:
+                pass
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -742,23 +907,199 @@ SOURCE_DEFAULT_TOPIC_DE = {
 }
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+#  IDENTITY TAG KEYWORDS  (women / lgbtqia+, per locale)
+# ─────────────────────────────────────────────────────────────────────────────
+IDENTITY_TERMS = {
+    "women": [
+        "women", "woman", "girl", "girls", "female", "feminine", "feminism",
+        "feminist", "gender", "reproductive", "abortion", "maternity",
+        "maternal", "sexism", "misogyny", "patriarchy", "period poverty",
+        "menstrual", "domestic violence", "sexual harassment", "metoo",
+        "me too", "femicide",
+    ],
+    "lgbtqia+": [
+        "lgbt", "lgbtq", "lgbtqia", "queer", "gay", "lesbian", "bisexual",
+        "transgender", "trans ", "nonbinary", "non-binary", "intersex",
+        "asexual", "pansexual", "pride", "drag", "same-sex", "homophobia",
+        "transphobia", "biphobia", "conversion therapy", "gender affirming",
+        "pronouns", "two-spirit", "marriage equality",
+    ],
+}
+
+IDENTITY_TERMS_DE = {
+    "women": [
+        "frauen", "frau", "mädchen", "weiblich", "feminismus", "feministisch",
+        "frauenrechte", "gleichstellung", "reproduktiv", "abtreibung",
+        "mutterschaft", "sexismus", "misogynie", "patriarchat",
+        "periodenarmut", "menstruation", "häusliche gewalt",
+        "sexuelle belästigung", "femizid", "geschlechtsspezifisch",
+    ],
+    "lgbtqia+": [
+        "lgbt", "lgbtq", "lgbtqia", "queer", "schwul", "lesbisch",
+        "bisexuell", "transgender", "trans ", "nichtbinär", "nicht-binär",
+        "intergeschlechtlich", "asexuell", "pansexuell", "pride", "drag",
+        "gleichgeschlechtlich", "homophobie", "transphobie",
+        "konversionstherapie", "geschlechtsangleichung", "pronomen",
+    ],
+}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  DATABASE SETUP
 # ─────────────────────────────────────────────────────────────────────────────
+# Per-feed HTTP validators (ETag / Last-Modified) for conditional GETs.
+# content_length is the size of the last full download, used to report the
+# bytes a 304 saved. The rest is the polling schedule (see schedule_feed).
+FEED_STATE_DDL = """
+    CREATE TABLE IF NOT EXISTS feed_state (
+        feed_url         TEXT PRIMARY KEY,
+        etag             TEXT,
+        last_modified    TEXT,
+        content_length   INTEGER DEFAULT 0,
+        checked_at       TEXT,
+        newest_entry     TEXT,
+        entries          INTEGER DEFAULT 0,
+        new_entries      INTEGER DEFAULT 0,
+        entry_rate       REAL,
+        next_due         TEXT
+    )
+"""
+
+# Added to feed_state after the validators; ALTERed into older tables
+FEED_SCHEDULE_COLUMNS = (("newest_entry", "TEXT"), ("entries", "INTEGER DEFAULT 0"),
+                         ("new_entries", "INTEGER DEFAULT 0"), ("entry_rate", "REAL"),
+                         ("next_due", "TEXT"))
+
+
+# Full-text search. Postgres: a generated tsvector (german / english config
+# chosen by locale) with a GIN index. SQLite: one external-content FTS5 table
+# per locale (porter stemming for English only), kept in sync by triggers.
+PG_SEARCH_DDL = [
+    """ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+       GENERATED ALWAYS AS (to_tsvector(
+           CASE WHEN locale = 'de' THEN 'german'::regconfig ELSE 'english'::regconfig END,
+           coalesce(title, '') || ' ' || coalesce(summary, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_articles_search ON articles USING GIN (search_vector)",
+]
+
+SQLITE_FTS_TABLES = {
+    "en": ("articles_fts_en", "porter unicode61 remove_diacritics 2", "COALESCE({row}.locale, 'en') <> 'de'"),
+    "de": ("articles_fts_de", "unicode61 remove_diacritics 2",        "{row}.locale = 'de'"),
+}
+
+
+def _setup_sqlite_fts(cursor):
+    """Create the FTS5 tables + triggers (backfilling on first run). No FTS5 → LIKE search."""
+    for table, tokenizer, where in SQLITE_FTS_TABLES.values():
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", [table])
+        if cursor.fetchone():
+            continue
+        try:
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE {table} USING fts5(
+                    title, summary, content='articles', content_rowid='id',
+                    tokenize='{tokenizer}'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  SQLite FTS5 unavailable, search falls back to LIKE: {e}", flush=True)
+            return
+        new, old = where.format(row="new"), where.format(row="old")
+        cursor.executescript(f"""
+            CREATE TRIGGER {table}_ai AFTER INSERT ON articles WHEN {new} BEGIN
+                INSERT INTO {table}(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+            END;
+            CREATE TRIGGER {table}_ad AFTER DELETE ON articles WHEN {old} BEGIN
+                INSERT INTO {table}({table}, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+            END;
+            CREATE TRIGGER {table}_aud AFTER UPDATE OF title, summary, locale ON articles WHEN {old} BEGIN
+                INSERT INTO {table}({table}, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+            END;
+            CREATE TRIGGER {table}_aui AFTER UPDATE OF title, summary, locale ON articles WHEN {new} BEGIN
+                INSERT INTO {table}(rowid, title, summary) VALUES (new.id, new.title, new.summary);
+            END;
+        """)
+        cursor.execute(f"INSERT INTO {table}(rowid, title, summary) "
+                       f"SELECT id, title, summary FROM articles WHERE {where.format(row='articles')}")
+
+
+# Normalized topics: one row per (topic, article) so multi-topic filters are
+# index lookups. topic_ids.id is the topic's bit position in TOPIC_BITS.
+TOPIC_TABLES_DDL = [
+    """CREATE TABLE IF NOT EXISTS topic_ids (
+        id   INTEGER PRIMARY KEY,
+        name TEXT NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS article_topics (
+        article_id INTEGER NOT NULL,
+        topic_id   INTEGER NOT NULL,
+        PRIMARY KEY (topic_id, article_id)
+    ) {without_rowid}""",
+    "CREATE INDEX IF NOT EXISTS idx_article_topics_article ON article_topics (article_id)",
+]
+
+
+# Composite indexes for the listing queries: every filter column paired with
+# the (scraped_at, id) keyset order, plus a partial index for free_only.
+# {false} is the backend's literal for a false paywall flag.
+ARTICLE_INDEXES_DDL = [
+    "CREATE INDEX IF NOT EXISTS idx_articles_scraped ON articles (scraped_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_source  ON articles (source, scraped_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_country ON articles (country, scraped_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_locale  ON articles (locale, scraped_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_articles_free    ON articles (scraped_at, id) "
+    "WHERE COALESCE(paywall_override, is_paywalled) = {false}",
+]
+
+
+def sync_article_topics(cursor, where, params):
+    """Rebuild article_topics from topic_mask for the articles matching `where` (alias a)."""
+    cursor.execute(f"DELETE FROM article_topics WHERE article_id IN "
+                   f"(SELECT a.id FROM articles a WHERE {where})", params)
+    cursor.execute(f"""
+        INSERT INTO article_topics (article_id, topic_id)
+        SELECT a.id, t.id FROM articles a
+          JOIN topic_ids t ON (a.topic_mask & (1 << t.id)) <> 0
+         WHERE {where}
+    """, params)
+
+
+def _backfill_topic_masks(conn, batch_size=ID_BATCH):
+    cursor = conn.cursor()
+    ph     = "%s" if USE_POSTGRES else "?"
+    while True:
+        cursor.execute(f"SELECT id, topics, tags FROM articles WHERE topic_mask IS NULL "
+                       f"ORDER BY id LIMIT {ph}", [batch_size])
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        cursor.executemany(
+            f"UPDATE articles SET topic_mask = {ph} WHERE id = {ph}",
+            [(topic_mask(split_taxonomy_names(topics)[0] + split_taxonomy_names(tags)[0]), article_id)
+             for article_id, topics, tags in rows]
+        )
+        ids = [row[0] for row in rows]
+        sync_article_topics(cursor, f"a.id IN ({', '.join([ph] * len(ids))})", ids)
+        conn.commit()
+
+
 def setup_database():
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).isoformat()
 
     if USE_SUPABASE:
         # Table is created via supabase/schema.sql — just purge old articles
         try:
-            _supabase.table("articles").delete().lt("scraped_at", cutoff).execute()
+            purge_expired(cutoff)
             print("✅ Supabase: old articles purged.", flush=True)
         except Exception as e:
             print(f"⚠️  Supabase purge failed (non-fatal): {e}", flush=True)
         return
 
     # ── SQLite / Postgres fallback ────────────────────────────────────────
-    conn   = get_connection()
+    conn   = acquire_connection()
     cursor = conn.cursor()
     ph     = "%s" if USE_POSTGRES else "?"
 
@@ -766,7 +1107,7 @@ def setup_database():
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS articles (
                 id               SERIAL PRIMARY KEY,
-                url_hash         TEXT UNIQUE,
+                url_hash         BYTEA UNIQUE,
                 title            TEXT,
                 link             TEXT,
                 summary          TEXT,
@@ -779,7 +1120,11 @@ def setup_database():
                 published_at     TEXT    DEFAULT '',
                 is_paywalled     BOOLEAN DEFAULT FALSE,
                 locale           TEXT    DEFAULT 'en',
-                paywall_override BOOLEAN DEFAULT NULL
+                paywall_override BOOLEAN DEFAULT NULL,
+                taxonomy_version TEXT    DEFAULT '',
+                topic_mask       INTEGER DEFAULT NULL,
+                simhash          BIGINT  DEFAULT NULL,
+                story_id         BIGINT  DEFAULT NULL
             )
         """)
         conn.commit()
@@ -790,6 +1135,10 @@ def setup_database():
             "ALTER TABLE articles ADD COLUMN IF NOT EXISTS is_paywalled BOOLEAN DEFAULT FALSE",
             "ALTER TABLE articles ADD COLUMN IF NOT EXISTS locale TEXT DEFAULT 'en'",
             "ALTER TABLE articles ADD COLUMN IF NOT EXISTS paywall_override BOOLEAN DEFAULT NULL",
+            "ALTER TABLE articles ADD COLUMN IF NOT EXISTS taxonomy_version TEXT DEFAULT ''",
+            "ALTER TABLE articles ADD COLUMN IF NOT EXISTS topic_mask INTEGER DEFAULT NULL",
+            "ALTER TABLE articles ADD COLUMN IF NOT EXISTS simhash BIGINT DEFAULT NULL",
+            "ALTER TABLE articles ADD COLUMN IF NOT EXISTS story_id BIGINT DEFAULT NULL",
         ]:
             try:
                 cursor.execute(col_sql)
@@ -798,11 +1147,19 @@ def setup_database():
                 conn.rollback()
         cursor.execute("UPDATE articles SET locale = 'en' WHERE locale IS NULL")
         conn.commit()
+        cursor.execute(FEED_STATE_DDL)
+        for col, col_type in FEED_SCHEDULE_COLUMNS:
+            cursor.execute(f"ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS {col} {col_type}")
+        for ddl in [ARTICLE_STATS_DDL] + PG_SEARCH_DDL + [d.format(without_rowid="") for d in TOPIC_TABLES_DDL]:
+            cursor.execute(ddl)
+        for ddl in ARTICLE_INDEXES_DDL:
+            cursor.execute(ddl.format(false="FALSE"))
+        conn.commit()
     else:
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS articles (
                 id               INTEGER PRIMARY KEY AUTOINCREMENT,
-                url_hash         TEXT UNIQUE,
+                url_hash         BLOB UNIQUE,
                 title            TEXT,
                 link             TEXT,
                 summary          TEXT,
@@ -815,7 +1172,11 @@ def setup_database():
                 published_at     TEXT    DEFAULT '',
                 is_paywalled     INTEGER DEFAULT 0,
                 locale           TEXT    DEFAULT 'en',
-                paywall_override INTEGER DEFAULT NULL
+                paywall_override INTEGER DEFAULT NULL,
+                taxonomy_version TEXT    DEFAULT '',
+                topic_mask       INTEGER DEFAULT NULL,
+                simhash          INTEGER DEFAULT NULL,
+                story_id         INTEGER DEFAULT NULL
             )
         """)
         for col, default in [
@@ -825,29 +1186,370 @@ def setup_database():
             ("is_paywalled",     "0"),
             ("locale",           "'en'"),
             ("paywall_override", "NULL"),
+            ("taxonomy_version", "''"),
         ]:
             try:
                 cursor.execute(f"ALTER TABLE articles ADD COLUMN {col} TEXT DEFAULT {default}")
             except sqlite3.OperationalError:
                 pass
+        for col in ("topic_mask", "simhash", "story_id"):
+            try:
+                cursor.execute(f"ALTER TABLE articles ADD COLUMN {col} INTEGER DEFAULT NULL")
+            except sqlite3.OperationalError:
+                pass
+        for ddl in [FEED_STATE_DDL, ARTICLE_STATS_DDL] + [d.format(without_rowid="WITHOUT ROWID") for d in TOPIC_TABLES_DDL]:
+            cursor.execute(ddl)
+        for col, col_type in FEED_SCHEDULE_COLUMNS:
+            try:
+                cursor.execute(f"ALTER TABLE feed_state ADD COLUMN {col} {col_type}")
+            except sqlite3.OperationalError:
+                pass
+        for ddl in ARTICLE_INDEXES_DDL:
+            cursor.execute(ddl.format(false="0"))
+        conn.commit()
+        _setup_sqlite_fts(cursor)
         conn.commit()
 
-    # Purge articles older than 30 days
-    cursor.execute(f"DELETE FROM articles WHERE scraped_at < {ph}", [cutoff])
+    # topic_ids mirrors TOPIC_BITS; backfill masks / story ids for older rows
+    cursor.executemany(
+        f"INSERT INTO topic_ids (id, name) VALUES ({ph}, {ph}) "
+        f"ON CONFLICT (id) DO UPDATE SET name = excluded.name",
+        list(enumerate(TAXONOMY_TAGS))
+    )
     conn.commit()
-    conn.close()
+    _backfill_topic_masks(conn)
+    _backfill_story_ids(conn)
+
+    # First run with the rollup (or after it was dropped): fill it once
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM article_stats), EXISTS (SELECT 1 FROM articles)")
+    has_stats, has_articles = cursor.fetchone()
+    if has_articles and not has_stats:
+        apply_article_stats(cursor, "1 = 1", [])
+        conn.commit()
+
+    # One-off switch from md5(link) hex keys to url_hash(canonical link)
+    needs_rekey = _url_hash_needs_rekey(cursor)
+    release_connection(conn)
+    if needs_rekey:
+        rekey_articles()
+
+    purge_expired(cutoff)
     print("✅ Database ready.", flush=True)
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+#  RETENTION  — chunked purge, optionally archiving expired rows first
+# ─────────────────────────────────────────────────────────────────────────────
+def _open_archive(archive_dir, day):
+    # Appending adds a new gzip member / zstd frame; both decompress as one stream
+    if ARCHIVE_FORMAT == "zstd" and importlib.util.find_spec("zstandard"):
+        import zstandard
+        path = os.path.join(archive_dir, f"articles-{day}.jsonl.zst")
+        return zstandard.ZstdCompressor().stream_writer(open(path, "ab"), closefd=True)
+    import gzip
+    return gzip.open(os.path.join(archive_dir, f"articles-{day}.jsonl.gz"), "ab")
+
+
+def archive_rows(rows, archive_dir):
+    """Append row dicts as JSON lines to one compressed file per scraped_at day."""
+    os.makedirs(archive_dir, exist_ok=True)
+    by_day = {}
+    for row in rows:
+        by_day.setdefault(str(row["scraped_at"])[:10], []).append(row)
+    for day, day_rows in sorted(by_day.items()):
+        with _open_archive(archive_dir, day) as archive:
+            archive.write("".join(json.dumps({**row, "url_hash": url_hash_hex(row["url_hash"])},
+                                             default=str, ensure_ascii=False) + "\n"
+                                  for row in day_rows).encode("utf-8"))
+    return len(rows)
+
+
+def _delete_articles(cursor, ids):
+    """Delete articles by id (SQLite / Postgres) with their rollup counts and topic rows."""
+    marks = ", ".join(["%s" if USE_POSTGRES else "?"] * len(ids))
+    apply_article_stats(cursor, f"a.id IN ({marks})", ids, sign=-1)
+    cursor.execute(f"DELETE FROM article_topics WHERE article_id IN ({marks})", ids)
+    cursor.execute(f"DELETE FROM articles WHERE id IN ({marks})", ids)
+
+
+def purge_expired(cutoff=None, archive_dir=None, chunk_size=RETENTION_CHUNK):
+    """
+    Delete articles scraped before cutoff (default: RETENTION_DAYS ago),
+    oldest first, chunk_size rows per transaction. Each chunk is archived
+    (archive_dir, default ARCHIVE_DIR; "" = no archive) before it is deleted,
+    so a failed write leaves the rows in place. Returns {purged, archived, seconds}.
+    """
+    if cutoff is None:
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=RETENTION_DAYS)).isoformat()
+    archive_dir = ARCHIVE_DIR if archive_dir is None else archive_dir
+    columns     = ("id",) + ARTICLE_COLUMNS + ("paywall_override",)
+    started     = time.perf_counter()
+    totals      = {"purged": 0, "archived": 0}
+
+    def chunks():
+        if USE_SUPABASE:
+            table = _supabase_client().table("articles")
+            while True:
+                rows = (table.select(", ".join(columns)).lt("scraped_at", cutoff)
+                        .order("scraped_at").limit(chunk_size).execute().data or [])
+                if rows:
+                    yield rows
+                if len(rows) < chunk_size:
+                    return
+        else:
+            while True:
+                cursor.execute(f"SELECT {', '.join(columns)} FROM articles "
+                               f"WHERE scraped_at < {ph} ORDER BY scraped_at, id LIMIT {ph}",
+                               [cutoff, chunk_size])
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                if rows:
+                    yield rows
+                if len(rows) < chunk_size:
+                    return
+
+    conn   = None if USE_SUPABASE else acquire_connection()
+    cursor = conn.cursor() if conn else None
+    ph     = "%s" if USE_POSTGRES else "?"
+    try:
+        for rows in chunks():
+            if archive_dir:
+                totals["archived"] += archive_rows(rows, archive_dir)
+            ids = [row["id"] for row in rows]
+            if USE_SUPABASE:
+                # article_stats is kept in step by the delete trigger
+                _supabase_client().table("articles").delete().in_("id", ids).execute()
+            else:
+                _delete_articles(cursor, ids)
+                conn.commit()
+            totals["purged"] += len(ids)
+    except Exception:
+        if conn:
+            conn.rollback()
+        raise
+    finally:
+        if conn:
+            release_connection(conn)
+        if totals["purged"]:
+            bump_scrape_generation()
+
+    elapsed = time.perf_counter() - started
+    print(f"🧹 Purged {totals['purged']} articles older than {RETENTION_DAYS} days "
+          f"({totals['archived']} archived) in {elapsed:.1f}s.", flush=True)
+    return {**totals, "seconds": elapsed}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  URL KEYS  — re-key stored rows with url_hash(canonical_url(link))
+# ─────────────────────────────────────────────────────────────────────────────
+def _url_hash_needs_rekey(cursor):
+    """True while url_hash still holds the old hex-text keys (SQLite / Postgres)."""
+    if USE_POSTGRES:
+        cursor.execute("SELECT data_type FROM information_schema.columns "
+                       "WHERE table_name = 'articles' AND column_name = 'url_hash'")
+        row = cursor.fetchone()
+        return bool(row) and row[0] == "text"
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM articles WHERE typeof(url_hash) = 'text')")
+    return bool(cursor.fetchone()[0])
+
+
+def rekey_articles(page_size=ID_BATCH):
+    """
+    Recompute every stored url_hash from its link and merge rows that now
+    share a key: the oldest row (lowest id) is kept, taking over a
+    paywall_override it lacks, and the rest are deleted. Run once after the
+    switch from md5(link) keys (setup_database does so for SQLite / Postgres)
+    and after changing the canonicalization rules. Returns {rekeyed, merged}.
+    """
+    started = time.perf_counter()
+    keep, rekey, merged, overrides = {}, [], [], {}
+    stored_keys = set()
+
+    if USE_SUPABASE:
+        table, start = _supabase_client().table("articles"), 0
+        while True:
+            rows = (table.select("id, link, url_hash, paywall_override").order("id")
+                    .range(start, start + page_size - 1).execute().data or [])
+            for r in rows:
+                key = url_hash(r["link"])
+                if key in keep:
+                    merged.append(r["id"])
+                    if r["paywall_override"] is not None:
+                        overrides.setdefault(keep[key], r["paywall_override"])
+                    continue
+                keep[key] = r["id"]
+                stored_keys.add(r["url_hash"])
+                if r["url_hash"] != key.hex():
+                    rekey.append((key.hex(), r["id"]))
+            if len(rows) < page_size:
+                break
+            start += page_size
+        for i in range(0, len(merged), page_size):
+            table.delete().in_("id", merged[i:i + page_size]).execute()
+        # A key still held by another row (rules changed) is written after
+        # that row has moved to its own new key
+        for key, article_id in sorted(rekey, key=lambda item: item[0] in stored_keys):
+            table.update({"url_hash": key}).eq("id", article_id).execute()
+        for article_id, override in overrides.items():
+            table.update({"paywall_override": override}).eq("id", article_id) \
+                 .is_("paywall_override", "null").execute()
+    else:
+        conn   = acquire_connection()
+        cursor = conn.cursor()
+        ph     = "%s" if USE_POSTGRES else "?"
+        try:
+            if USE_POSTGRES and _url_hash_needs_rekey(cursor):
+                cursor.execute("ALTER TABLE articles ALTER COLUMN url_hash TYPE BYTEA "
+                               "USING decode(url_hash, 'hex')")
+            cursor.execute("SELECT id, link, url_hash, paywall_override FROM articles ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                for article_id, link, stored, override in rows:
+                    key = url_hash(link)
+                    if key in keep:
+                        merged.append(article_id)
+                        if override is not None:
+                            overrides.setdefault(keep[key], override)
+                        continue
+                    keep[key] = article_id
+                    if isinstance(stored, str) or stored is None or bytes(stored) != key:
+                        rekey.append((key, article_id))
+            # Duplicates go first and re-keyed rows pass through NULL, so no
+            # row ever collides with a key that is about to be freed
+            for i in range(0, len(merged), page_size):
+                _delete_articles(cursor, merged[i:i + page_size])
+            cursor.executemany(f"UPDATE articles SET url_hash = NULL WHERE id = {ph}",
+                               [(article_id,) for _, article_id in rekey])
+            cursor.executemany(f"UPDATE articles SET url_hash = {ph} WHERE id = {ph}", rekey)
+            # An inherited override can flip the paywalled counts: take the
+            # rows out of the rollup and add them back once updated
+            override_ids = list(overrides)
+            for i in range(0, len(override_ids), page_size):
+                ids   = override_ids[i:i + page_size]
+                where = f"a.id IN ({', '.join([ph] * len(ids))})"
+                apply_article_stats(cursor, where, ids, sign=-1)
+                cursor.executemany(f"UPDATE articles SET paywall_override = {ph} "
+                                   f"WHERE id = {ph} AND paywall_override IS NULL",
+                                   [(overrides[article_id], article_id) for article_id in ids])
+                apply_article_stats(cursor, where, ids)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            release_connection(conn)
+
+    if merged or rekey:
+        bump_scrape_generation()
+    print(f"🔑 Re-keyed {len(rekey)} articles, merged {len(merged)} duplicates "
+          f"in {time.perf_counter() - started:.1f}s.", flush=True)
+    return {"rekeyed": len(rekey), "merged": len(merged)}
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  HELPERS
 # ─────────────────────────────────────────────────────────────────────────────
+# ── URL canonicalization ─────────────────────────────────────────────────────
+# Query parameters that never identify an article (campaign / referrer
+# tracking, AMP switches). Lower-cased; URL_TRACKING_PREFIXES match by prefix.
+URL_TRACKING_PARAMS   = {
+    "amp", "outputtype", "cmp", "cmpid", "ocid", "ncid", "smid", "eref", "ito", "ref",
+    "rss", "src", "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+}
+URL_TRACKING_PREFIXES = ("utm_", "at_", "wt_", "pk_", "__twitter")
+
+# Per-host query rules on top of the defaults: "allow" keeps only the listed
+# parameters (the article id lives in the query), "deny" drops more.
+URL_QUERY_RULES = {
+    "queer.de":    {"allow": {"article_id"}},
+    "reuters.com": {"deny":  {"feedtype", "feedname"}},
+}
+
+
+def canonical_url(url):
+    """
+    The form of a link used for dedup: https, lower-case host without
+    www. / amp., no default port, fragment or AMP path segment, no trailing
+    slash, tracking parameters dropped and the rest sorted. Non-http(s)
+    links are only stripped of surrounding whitespace.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urllib.parse.urlsplit(url)
+        port  = parts.port
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    for prefix in ("www.", "amp."):
+        host = host[len(prefix):] if host.startswith(prefix) else host
+    if port not in (None, 80, 443):
+        host = f"{host}:{port}"
+
+    path = "/".join(seg for seg in parts.path.split("/") if seg.lower() != "amp")
+    path = path.rstrip("/") or "/"
+
+    rules = URL_QUERY_RULES.get(host, {})
+    query = []
+    for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True):
+        name = key.lower()
+        if "allow" in rules:
+            keep = name in rules["allow"]
+        else:
+            keep = (name not in URL_TRACKING_PARAMS and name not in rules.get("deny", ())
+                    and not name.startswith(URL_TRACKING_PREFIXES))
+        if keep:
+            query.append((key, value))
+    return urllib.parse.urlunsplit(("https", host, path, urllib.parse.urlencode(sorted(query)), ""))
+
+
 def url_hash(url):
-    return hashlib.md5(url.encode()).hexdigest()
+    """Dedup key: 16-byte BLAKE2b of canonical_url(url) (hex on Supabase, see url_hash_hex)."""
+    return hashlib.blake2b(canonical_url(url).encode(), digest_size=16).digest()
+
+
+def url_hash_hex(value):
+    """Hex form of a stored url_hash (bytes / memoryview from SQL, already hex from Supabase)."""
+    return value if isinstance(value, str) or value is None else bytes(value).hex()
+
+
+_TAG_RE   = re.compile(r"<[^>]+>")
+_SPACE_RE = re.compile(r"\s+")
 
 
 def strip_html(text):
-    return re.sub(r'<[^>]+>', '', text or '').strip()
+    """Display form of feed text: tags stripped, entities decoded, NFC, whitespace collapsed."""
+    text = html.unescape(_TAG_RE.sub("", text or ""))
+    return _SPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def match_string(text):
+    """Form the keyword automata match against (keywords get the same treatment)."""
+    return unicodedata.normalize("NFC", text).casefold()
+
+
+class NormalizedEntry:
+    """
+    A feed entry after the one-time text pass: display title / summary
+    (strip_html) and the casefolded match string every classifier reads.
+    """
+    __slots__ = ("title", "summary", "match")
+
+    def __init__(self, title, summary):
+        self.title   = title
+        self.summary = summary
+        self.match   = match_string(f"{title} {summary}")
+
+
+def normalize_entry(entry):
+    """NormalizedEntry for a feed entry (or any mapping with title / summary)."""
+    if isinstance(entry, NormalizedEntry):
+        return entry
+    return NormalizedEntry(strip_html(entry.get("title", "No title")),
+                           strip_html(entry.get("summary", "")))
 
 
 def extract_published_at(entry) -> str:
@@ -862,85 +1564,245 @@ def extract_published_at(entry) -> str:
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-#  PAYWALL DETECTION
+#  KEYWORD AUTOMATON
+#  Aho-Corasick over every keyword list of a locale. One pass over the
+#  lower-cased text finds all keywords (plain substring semantics, exactly
+#  like `kw in text`), each labelled with what it signals:
+#    ("gate", None)          — KEYWORDS / KEYWORDS_DE inclusion gate
+#    ("identity", tag)       — IDENTITY_TERMS(_DE)
+#    ("topic", topic_name)   — TOPIC_KEYWORDS(_DE)
+#    ("paywall", None)       — PAYWALL_SIGNAL_PHRASES(_DE)
 # ─────────────────────────────────────────────────────────────────────────────
-def detect_paywall(entry, source: str, locale: str = "en") -> bool:
-    if source in PAYWALLED_SOURCES:
-        return True
-    title   = strip_html(entry.get("title",   "") or "").lower()
-    summary = strip_html(entry.get("summary", "") or "")
-    combined = title + " " + summary.lower()
+class KeywordMatcher:
+    """Multi-pattern matcher; cost grows with text length, not keyword count."""
+
+    def __init__(self, labelled_keywords):
+        goto    = [{}]
+        outputs = [set()]
+        for keyword, label in labelled_keywords:
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add((keyword, label))
+
+        # Breadth-first: failure links, merged outputs, and a sparse DFA in
+        # which each state only stores transitions that don't lead to the
+        # same place as the root's (anything else falls back to the root).
+        root  = goto[0]
+        fail  = [0] * len(goto)
+        delta = [{} for _ in goto]
+        queue = list(root.values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                outputs[nxt] |= outputs[fail[nxt]]
+            merged = {**delta[fail[state]], **goto[state]}
+            delta[state] = {ch: t for ch, t in merged.items() if root.get(ch, 0) != t}
+
+        self._root    = root
+        self._delta   = delta
+        self._outputs = [tuple(o) for o in outputs]
+
+    def find(self, text):
+        """Return the set of (keyword, label) pairs that occur in text."""
+        root, delta, outputs = self._root, self._delta, self._outputs
+        found = set()
+        state = 0
+        for ch in text:
+            nxt = delta[state].get(ch)
+            state = root.get(ch, 0) if nxt is None else nxt
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+    def labels(self, text):
+        """Return the set of labels whose keywords occur in text."""
+        return {label for _, label in self.find(text)}
+
+
+def _build_matcher(gate_keywords, identity_terms, topic_keywords, paywall_phrases):
+    labelled = [(kw, ("gate", None)) for kw in gate_keywords]
+    for tag, terms in identity_terms.items():
+        labelled += [(kw, ("identity", tag)) for kw in terms]
+    for topic_name, keywords in topic_keywords.items():
+        labelled += [(kw, ("topic", topic_name)) for kw in keywords]
+    labelled += [(phrase, ("paywall", None)) for phrase in paywall_phrases]
+    return KeywordMatcher([(match_string(kw), label) for kw, label in labelled])
+
+
+# Sources exempt from the inclusion gate and the short-summary paywall check
+ALL_ALWAYS_INCLUDE_SOURCES = ALWAYS_INCLUDE_SOURCES | DE_ALWAYS_INCLUDE_SOURCES
+
+# Everything the classifiers need per locale. The tables are plain data; the
+# "matcher" automaton is built from "keyword_lists" by _tables() on first use.
+LOCALE_TABLES = {
+    "en": {
+        "matcher":        None,
+        "keyword_lists":  (KEYWORDS, IDENTITY_TERMS, TOPIC_KEYWORDS, PAYWALL_SIGNAL_PHRASES),
+        "topics":         list(TOPIC_KEYWORDS),
+        "default_topic":  SOURCE_DEFAULT_TOPIC,
+        "feminist":       FEMINIST_SOURCES,
+        "lgbtqia":        LGBTQIA_SOURCES,
+    },
+    "de": {
+        "matcher":        None,
+        "keyword_lists":  (KEYWORDS_DE, IDENTITY_TERMS_DE, TOPIC_KEYWORDS_DE,
+                           PAYWALL_SIGNAL_PHRASES_DE),
+        "topics":         list(TOPIC_KEYWORDS_DE),
+        "default_topic":  SOURCE_DEFAULT_TOPIC_DE,
+        "feminist":       DE_FEMINIST_SOURCES,
+        "lgbtqia":        DE_LGBTQIA_SOURCES,
+    },
+}
 
-    # Check locale-appropriate paywall phrases
-    phrases = PAYWALL_SIGNAL_PHRASES_DE if locale == "de" else PAYWALL_SIGNAL_PHRASES
-    for phrase in phrases:
-        if phrase in combined:
-            return True
 
-    # Short-content heuristic (likely truncated behind paywall)
-    all_always_include = ALWAYS_INCLUDE_SOURCES | DE_ALWAYS_INCLUDE_SOURCES
-    if source not in all_always_include and 0 < len(summary.strip()) < 120:
+# Bumped when strip_html / match_string change what the automata see
+TEXT_NORMALIZATION = "unescape-nfc-casefold-1"
+
+# Fingerprint of every dictionary that influences tags/topics. Stored per row
+# (articles.taxonomy_version) so recategorize only revisits rows tagged under
+# an older taxonomy.
+TAXONOMY_VERSION = hashlib.sha1(json.dumps([
+    TEXT_NORMALIZATION, KEYWORDS, KEYWORDS_DE, IDENTITY_TERMS, IDENTITY_TERMS_DE,
+    TOPIC_KEYWORDS, TOPIC_KEYWORDS_DE, SOURCE_DEFAULT_TOPIC, SOURCE_DEFAULT_TOPIC_DE,
+    sorted(FEMINIST_SOURCES), sorted(LGBTQIA_SOURCES),
+    sorted(DE_FEMINIST_SOURCES), sorted(DE_LGBTQIA_SOURCES),
+]).encode()).hexdigest()[:16]
+
+
+# Bit positions for the normalized representation: the 9 system categories
+# in taxonomy order, then the identity tags. articles.topic_mask ORs the bits
+# of an article's topics + tags; topic_ids / article_topics use the position
+# as the topic id.
+TAXONOMY_TAGS = list(TOPIC_KEYWORDS) + list(IDENTITY_TERMS)
+TOPIC_BITS    = {name: 1 << i for i, name in enumerate(TAXONOMY_TAGS)}
+
+
+def topic_mask(names):
+    """OR together the bits of the given topic / identity tag names."""
+    mask = 0
+    for name in names:
+        mask |= TOPIC_BITS.get(name, 0)
+    return mask
+
+
+def split_taxonomy_names(value):
+    """
+    Split a comma-joined topics / tags string into (known taxonomy names,
+    other parts). Several topic names contain ", " themselves, so the longest
+    run of parts that forms a known name wins.
+    """
+    parts = [part.strip() for part in (value or "").split(",") if part.strip()]
+    known, other, i = [], [], 0
+    while i < len(parts):
+        for j in range(len(parts), i, -1):
+            name = ", ".join(parts[i:j])
+            if name in TOPIC_BITS:
+                known.append(name)
+                i = j
+                break
+        else:
+            other.append(parts[i])
+            i += 1
+    return known, other
+
+
+_matcher_lock = threading.Lock()
+
+
+def _tables(locale):
+    tables = LOCALE_TABLES["de" if locale == "de" else "en"]
+    if tables["matcher"] is None:
+        with _matcher_lock:
+            if tables["matcher"] is None:
+                tables["matcher"] = _build_matcher(*tables["keyword_lists"])
+    return tables
+
+
+def _identity_tags(labels, source, tables):
+    tags = set()
+    if source in tables["feminist"] or ("identity", "women") in labels:
+        tags.add("women")
+    if source in tables["lgbtqia"] or ("identity", "lgbtqia+") in labels:
+        tags.add("lgbtqia+")
+    return sorted(tags)
+
+
+def _system_topics(labels, source, tables):
+    # Ordered by taxonomy, capped at 3 system tags
+    matched = [t for t in tables["topics"] if ("topic", t) in labels][:3]
+
+    # Fallback for always-include sources that matched no keyword
+    if not matched and source in tables["default_topic"]:
+        matched = [tables["default_topic"][source]]
+    return matched
+
+
+def _is_paywalled(labels, summary, source):
+    if source in PAYWALLED_SOURCES or ("paywall", None) in labels:
         return True
+    # Short-content heuristic (likely truncated behind paywall)
+    return source not in ALL_ALWAYS_INCLUDE_SOURCES and 0 < len(summary) < 120
 
-    return False
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  CLASSIFICATION ENGINE  — shared by ingest and recategorize
+# ─────────────────────────────────────────────────────────────────────────────
+def classify_entry(entry, source, locale: str = "en"):
+    """
+    Classify one entry (a feed entry, any mapping with title / summary, or a
+    NormalizedEntry) with a single automaton pass over its match string.
+
+    Returns a dict with the cleaned title and summary, the inclusion-gate
+    decision (keep), identity_tags, system_topics, their stored string forms
+    (category / tags / topics) and is_paywalled.
+    """
+    tables  = _tables(locale)
+    entry   = normalize_entry(entry)
+    title   = entry.title
+    summary = entry.summary
+    labels  = tables["matcher"].labels(entry.match)
+
+    identity_tags = _identity_tags(labels, source, tables)
+    system_topics = _system_topics(labels, source, tables)
+    return {
+        "title":         title,
+        "summary":       summary,
+        "keep":          source in ALL_ALWAYS_INCLUDE_SOURCES or ("gate", None) in labels,
+        "identity_tags": identity_tags,
+        "system_topics": system_topics,
+        # Category field (legacy — kept for backward compat)
+        "category":      "lgbtqia+" if "lgbtqia+" in identity_tags else "women",
+        "tags":          ", ".join(identity_tags) if identity_tags else "general",
+        "topics":        ", ".join(system_topics),
+        "topic_mask":    topic_mask(system_topics + identity_tags),
+        "is_paywalled":  _is_paywalled(labels, summary, source),
+    }
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-#  KEYWORD MATCHING
+#  KEYWORD MATCHING  — single-purpose wrappers around the same tables
 # ─────────────────────────────────────────────────────────────────────────────
 def matches_keywords(title, summary, locale: str = "en"):
     """Gate check: return True if this article is relevant to the feed."""
-    combined = (title + " " + summary).lower()
-    kw_list = KEYWORDS_DE if locale == "de" else KEYWORDS
-    return any(kw in combined for kw in kw_list)
+    combined = match_string(title + " " + summary)
+    return ("gate", None) in _tables(locale)["matcher"].labels(combined)
 
 
 def get_identity_tags(text, source, locale: str = "en"):
     """Return identity tags (women / lgbtqia+) based on text + source type."""
-    text_lower = text.lower()
-    tags = set()
-
-    if locale == "de":
-        women_terms = [
-            "frauen", "frau", "mädchen", "weiblich", "feminismus", "feministisch",
-            "frauenrechte", "gleichstellung", "reproduktiv", "abtreibung",
-            "mutterschaft", "sexismus", "misogynie", "patriarchat",
-            "periodenarmut", "menstruation", "häusliche gewalt",
-            "sexuelle belästigung", "femizid", "geschlechtsspezifisch",
-        ]
-        lgbtq_terms = [
-            "lgbt", "lgbtq", "lgbtqia", "queer", "schwul", "lesbisch",
-            "bisexuell", "transgender", "trans ", "nichtbinär", "nicht-binär",
-            "intergeschlechtlich", "asexuell", "pansexuell", "pride", "drag",
-            "gleichgeschlechtlich", "homophobie", "transphobie",
-            "konversionstherapie", "geschlechtsangleichung", "pronomen",
-        ]
-        feminist_set  = DE_FEMINIST_SOURCES
-        lgbtqia_set   = DE_LGBTQIA_SOURCES
-    else:
-        women_terms = [
-            "women", "woman", "girl", "girls", "female", "feminine", "feminism",
-            "feminist", "gender", "reproductive", "abortion", "maternity",
-            "maternal", "sexism", "misogyny", "patriarchy", "period poverty",
-            "menstrual", "domestic violence", "sexual harassment", "metoo",
-            "me too", "femicide",
-        ]
-        lgbtq_terms = [
-            "lgbt", "lgbtq", "lgbtqia", "queer", "gay", "lesbian", "bisexual",
-            "transgender", "trans ", "nonbinary", "non-binary", "intersex",
-            "asexual", "pansexual", "pride", "drag", "same-sex", "homophobia",
-            "transphobia", "biphobia", "conversion therapy", "gender affirming",
-            "pronouns", "two-spirit", "marriage equality",
-        ]
-        feminist_set  = FEMINIST_SOURCES
-        lgbtqia_set   = LGBTQIA_SOURCES
-
-    if source in feminist_set or any(t in text_lower for t in women_terms):
-        tags.add("women")
-    if source in lgbtqia_set or any(t in text_lower for t in lgbtq_terms):
-        tags.add("lgbtqia+")
-
-    return sorted(tags)
+    tables = _tables(locale)
+    return _identity_tags(tables["matcher"].labels(match_string(text)), source, tables)
 
 
 def get_system_topics(text, source, locale: str = "en"):
@@ -949,198 +1811,1539 @@ def get_system_topics(text, source, locale: str = "en"):
     Returns an ordered list: strongest match first.
     Falls back to SOURCE_DEFAULT_TOPIC(_DE) if no keywords match.
     """
-    text_lower = text.lower()
-    matched = []
-
-    kw_map = TOPIC_KEYWORDS_DE if locale == "de" else TOPIC_KEYWORDS
-    for topic_name, keywords in kw_map.items():
-        if any(kw in text_lower for kw in keywords):
-            matched.append(topic_name)
-
-    # Deduplicate while preserving order
-    seen = set()
-    unique = []
-    for t in matched:
-        if t not in seen:
-            seen.add(t)
-            unique.append(t)
-    matched = unique[:3]  # cap at 3 system tags
+    tables = _tables(locale)
+    return _system_topics(tables["matcher"].labels(match_string(text)), source, tables)
 
-    # Fallback for always-include sources that matched no keyword
-    if not matched:
-        fallback_map = SOURCE_DEFAULT_TOPIC_DE if locale == "de" else SOURCE_DEFAULT_TOPIC
-        if source in fallback_map:
-            matched = [fallback_map[source]]
 
-    return matched
+# ─────────────────────────────────────────────────────────────────────────────
+#  PAYWALL DETECTION
+# ─────────────────────────────────────────────────────────────────────────────
+def detect_paywall(entry, source: str, locale: str = "en") -> bool:
+    if not isinstance(entry, NormalizedEntry):
+        entry = NormalizedEntry(strip_html(entry.get("title", "") or ""),
+                                strip_html(entry.get("summary", "") or ""))
+    labels = _tables(locale)["matcher"].labels(entry.match)
+    return _is_paywalled(labels, entry.summary, source)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-#  SCRAPING
+#  FEED STATE  — conditional GET validators, one row per feed URL
 # ─────────────────────────────────────────────────────────────────────────────
-def scrape_all_feeds():
-    total_new = 0
-    ph = "%s" if USE_POSTGRES else "?"
+FEED_STATE_COLUMNS = ("feed_url", "etag", "last_modified", "content_length", "checked_at") \
+                     + tuple(col for col, _ in FEED_SCHEDULE_COLUMNS)
+
+
+def load_feed_state():
+    """Return {feed_url: state dict}. Missing table / backend errors → {}."""
+    try:
+        if USE_SUPABASE:
+            rows = _supabase_client().table("feed_state").select("*").execute().data or []
+            return {r["feed_url"]: r for r in rows}
+
+        conn = acquire_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {', '.join(FEED_STATE_COLUMNS)} FROM feed_state")
+            rows = [dict(zip(FEED_STATE_COLUMNS, row)) for row in cursor.fetchall()]
+        finally:
+            release_connection(conn)
+        return {r["feed_url"]: r for r in rows}
+    except Exception as e:
+        print(f"  ⚠️  Could not load feed state (non-fatal): {e}", flush=True)
+        return {}
 
+
+def save_feed_state(states):
+    """Upsert the given state dicts (keyed by feed_url)."""
+    if not states:
+        return
+    rows = [{col: state.get(col) for col in FEED_STATE_COLUMNS} for state in states]
+    try:
+        if USE_SUPABASE:
+            _supabase_client().table("feed_state").upsert(rows).execute()
+            return
+
+        ph      = "%s" if USE_POSTGRES else "?"
+        updates = ", ".join(f"{col} = excluded.{col}" for col in FEED_STATE_COLUMNS[1:])
+        conn    = acquire_connection()
+        try:
+            conn.cursor().executemany(f"""
+                INSERT INTO feed_state ({', '.join(FEED_STATE_COLUMNS)})
+                VALUES ({', '.join([ph] * len(FEED_STATE_COLUMNS))})
+                ON CONFLICT (feed_url) DO UPDATE SET {updates}
+            """, [tuple(row[col] for col in FEED_STATE_COLUMNS) for row in rows])
+            conn.commit()
+        finally:
+            release_connection(conn)
+    except Exception as e:
+        print(f"  ⚠️  Could not save feed state (non-fatal): {e}", flush=True)
+
+
+# ── Adaptive polling ─────────────────────────────────────────────────────────
+def _parse_timestamp(value):
+    """Aware UTC datetime from an ISO string / datetime (naive = UTC), else None."""
+    if not value:
+        return None
+    if not isinstance(value, datetime):
+        try:
+            value = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def schedule_feed(state, now, published=(), entries=0):
+    """
+    Schedule fields for a feed checked at `now` (published: the fetched
+    entries' publish times).
+
+    New entries are the ones published after the newest entry seen on the
+    previous check, whether or not the gate kept them (entries without a
+    publish time are not counted). The entry rate per hour is the larger of
+    what this fetch shows (the spread of its publish times, and new entries
+    since the last check), smoothed with the previous rate. A 304 counts as
+    no new entries, so quiet feeds drift towards POLL_MAX_HOURS. A fetch that
+    was new from top to bottom at the cap may have missed entries, so it is
+    retried after POLL_MIN_HOURS.
+    """
+    state  = state or {}
+    times  = sorted(t for t in map(_parse_timestamp, published) if t)
+    last   = _parse_timestamp(state.get("checked_at"))
+    seen   = _parse_timestamp(state.get("newest_entry"))
+    new_entries = sum(1 for t in times if t > seen) if seen else len(times)
+    rates  = []
+    if len(times) >= 2 and times[-1] > times[0]:
+        rates.append((len(times) - 1) / ((times[-1] - times[0]).total_seconds() / 3600))
+    if last and now > last:
+        rates.append(new_entries / ((now - last).total_seconds() / 3600))
+    rate     = max(rates) if rates else None
+    previous = state.get("entry_rate")
+    if previous is not None:
+        rate = previous if rate is None else \
+               RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * previous
+
+    overflow = last is not None and entries >= MAX_ARTICLES_PER_SOURCE and new_entries >= entries
+    if rate is None or overflow:
+        hours = POLL_MIN_HOURS
+    elif rate <= 0:
+        hours = POLL_MAX_HOURS
+    else:
+        hours = min(POLL_MAX_HOURS, max(POLL_MIN_HOURS,
+                                        POLL_TARGET_FILL * MAX_ARTICLES_PER_SOURCE / rate))
+    newest = max([*times[-1:], *([seen] if seen else [])], default=None)
+    return {"newest_entry": newest.isoformat() if newest else state.get("newest_entry"),
+            "entries": entries, "new_entries": new_entries,
+            "entry_rate": None if rate is None else round(rate, 4),
+            "next_due": (now + timedelta(hours=hours)).isoformat()}
+
+
+def due_feeds(feed_state, now=None):
+    """The FEEDS entries due by now + POLL_SLACK (feeds never scheduled are due)."""
+    now = now or datetime.now(timezone.utc)
+    due = {}
     for source_name, feed_info in FEEDS.items():
-        feed_url = feed_info["url"]
-        country  = feed_info["country"]
-        locale   = feed_info.get("locale", "en")
-        print(f"  📡 Scraping [{locale.upper()}]: {source_name}...", flush=True)
+        next_due = _parse_timestamp((feed_state.get(feed_info["url"]) or {}).get("next_due"))
+        if next_due is None or next_due <= now + POLL_SLACK:
+            due[source_name] = feed_info
+    return due
 
-        new_count  = 0
-        batch_rows = []   # collected for Supabase batch upsert
 
-        # Only open a DB connection for SQLite/Postgres paths
-        conn   = get_connection() if not USE_SUPABASE else None
-        cursor = conn.cursor()   if conn else None
+# ─────────────────────────────────────────────────────────────────────────────
+#  KNOWN ARTICLES  — url_hash set for pre-insert dedup
+# ─────────────────────────────────────────────────────────────────────────────
+def load_known_hashes(page_size=1000):
+    """
+    Return the set of url_hash values already stored. setup_database() purges
+    everything outside the retention window first, so this is the window.
+    Backend errors → empty set (the UNIQUE constraint still catches repeats).
+    """
+    known = set()
+    try:
+        if USE_SUPABASE:
+            start = 0
+            while True:
+                rows = (_supabase_client().table("articles").select("url_hash").order("id")
+                        .range(start, start + page_size - 1).execute().data or [])
+                known.update(bytes.fromhex(r["url_hash"]) for r in rows)
+                if len(rows) < page_size:
+                    break
+                start += page_size
+            return known
+
+        conn = acquire_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT url_hash FROM articles")
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                known.update(bytes(row[0]) for row in rows)
+        finally:
+            release_connection(conn)
+    except Exception as e:
+        print(f"  ⚠️  Could not load known articles (non-fatal): {e}", flush=True)
+    return known
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  STORIES  — near-duplicate clustering across sources
+#  Every stored article carries a 64-bit SimHash of its normalized title +
+#  summary (articles.simhash) and the story it belongs to (articles.story_id,
+#  the SimHash of the story's first article; rows too short to sign get their
+#  own id once backfilled). An entry within STORY_DISTANCE bits of a stored
+#  article joins that story. Every entry is still classified on its own
+#  (gate, source rules, paywall); only the story_id is shared.
+#  Lookups go through a banded LSH index: the 64 bits are split into
+#  STORY_DISTANCE + 1 bands, so any two signatures that close agree exactly on
+#  at least one band and only the articles in those buckets are compared.
+# ─────────────────────────────────────────────────────────────────────────────
+STORY_DISTANCE  = int(os.environ.get("SCRAPER_STORY_DISTANCE", "5"))
+STORY_MIN_WORDS = 8       # shorter texts are too generic to cluster
+SIMHASH_BANDS   = STORY_DISTANCE + 1
+_BAND_EDGES     = [64 * i // SIMHASH_BANDS for i in range(SIMHASH_BANDS + 1)]
+_LANE_BITS      = 16      # per-bit counter width in _feature_lanes (max 65535 features)
+_MASK64         = (1 << 64) - 1
+_WORD_RE        = re.compile(r"\w+")
+
+
+# Lane-spread form of each byte value, and of 64 ones (one per lane)
+_BYTE_LANES = [sum(1 << (bit * _LANE_BITS) for bit in range(8) if byte >> bit & 1)
+               for byte in range(256)]
+_LANE_ONES  = sum(1 << (i * _LANE_BITS) for i in range(64))
+_BIT_CHARS  = bytes.maketrans(b"\x00\x01", b"01")
 
+
+@functools.lru_cache(maxsize=1 << 16)
+def _feature_lanes(feature):
+    """64-bit hash of one feature with bit i moved to the i-th 16-bit lane."""
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    return sum(_BYTE_LANES[byte] << (k * 8 * _LANE_BITS) for k, byte in enumerate(digest))
+
+
+def simhash(text):
+    """
+    Signed 64-bit SimHash of a match string (words + word pairs as features),
+    or None if it has fewer than STORY_MIN_WORDS words. Summing the lane-spread
+    feature hashes counts, per bit, how many features set it in one addition.
+    """
+    words = _WORD_RE.findall(text)[:4096]
+    if len(words) < STORY_MIN_WORDS:
+        return None
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    counts   = sum(map(_feature_lanes, features))
+    # Bias every lane so its top bit is set exactly when count > len / 2,
+    # then read those 64 top bits out as a binary string
+    bias  = (1 << (_LANE_BITS - 1)) - (len(features) // 2 + 1)
+    top   = (counts + bias * _LANE_ONES) >> (_LANE_BITS - 1) & _LANE_ONES
+    value = int(top.to_bytes(64 * _LANE_BITS // 8, "little")[::2][::-1].translate(_BIT_CHARS), 2)
+    # Signed, so it fits SQLite INTEGER / Postgres BIGINT
+    return value - (1 << 64) if value >> 63 else value
+
+
+class StoryIndex:
+    """Banded LSH index of stored signatures → story_id."""
+
+    def __init__(self):
+        # Per band: band value → {unsigned signature: story_id}
+        self.buckets = [{} for _ in range(SIMHASH_BANDS)]
+
+    @staticmethod
+    def _bands(key):
+        return [key >> lo & ((1 << (hi - lo)) - 1) for lo, hi in zip(_BAND_EDGES, _BAND_EDGES[1:])]
+
+    def find(self, signature):
+        """story_id of a stored signature within STORY_DISTANCE bits, else None."""
+        key = signature & _MASK64
+        for bucket, band in zip(self.buckets, self._bands(key)):
+            for other, story_id in bucket.get(band, {}).items():
+                if (key ^ other).bit_count() <= STORY_DISTANCE:
+                    return story_id
+        return None
+
+    def add(self, signature, story_id):
+        key = signature & _MASK64
+        for bucket, band in zip(self.buckets, self._bands(key)):
+            bucket.setdefault(band, {}).setdefault(key, story_id)
+
+    def __len__(self):
+        return sum(len(members) for members in self.buckets[0].values())
+
+
+def load_story_index(page_size=1000):
+    """
+    Return a StoryIndex of every stored article with a signature (the
+    retention window, as for load_known_hashes). Backend errors → empty index,
+    which only means this run starts new stories.
+    """
+    index = StoryIndex()
+    try:
+        if USE_SUPABASE:
+            start = 0
+            while True:
+                rows = (_supabase_client().table("articles").select("simhash, story_id")
+                        .not_.is_("simhash", "null").order("id")
+                        .range(start, start + page_size - 1).execute().data or [])
+                for r in rows:
+                    index.add(r["simhash"], r["story_id"])
+                if len(rows) < page_size:
+                    break
+                start += page_size
+            return index
+
+        conn = acquire_connection()
         try:
-            feed    = feedparser.parse(feed_url)
-            entries = feed.entries[:MAX_ARTICLES_PER_SOURCE]
-
-            for entry in entries:
-                link    = entry.get("link", "")
-                title   = strip_html(entry.get("title", "No title"))
-                summary = strip_html(entry.get("summary", ""))
-                hash_id = url_hash(link)
-
-                # Inclusion gate — locale-aware, skip for always-include sources
-                all_always_include = ALWAYS_INCLUDE_SOURCES | DE_ALWAYS_INCLUDE_SOURCES
-                always_keep = source_name in all_always_include
-                if not always_keep and not matches_keywords(title, summary, locale):
-                    continue
+            cursor = conn.cursor()
+            cursor.execute("SELECT simhash, story_id FROM articles WHERE simhash IS NOT NULL ORDER BY id")
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                for signature, story_id in rows:
+                    index.add(signature, story_id)
+        finally:
+            release_connection(conn)
+    except Exception as e:
+        print(f"  ⚠️  Could not load story index (non-fatal): {e}", flush=True)
+    return index
+
+
+def _backfill_story_ids(conn, batch_size=1000):
+    """
+    Sign and cluster rows without a story_id (stored before simhash /
+    story_id, or too short to sign at ingest), oldest first. Rows too short
+    to sign become their own story (story_id = id), so they are only
+    visited once.
+    """
+    cursor = conn.cursor()
+    ph     = "%s" if USE_POSTGRES else "?"
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM articles WHERE story_id IS NULL)")
+    if not cursor.fetchone()[0]:
+        return
+    index  = StoryIndex()
+    cursor.execute("SELECT simhash, story_id FROM articles WHERE simhash IS NOT NULL")
+    for signature, story_id in cursor.fetchall():
+        index.add(signature, story_id)
+
+    last_id = 0
+    while True:
+        cursor.execute(f"SELECT id, title, summary FROM articles "
+                       f"WHERE story_id IS NULL AND id > {ph} ORDER BY id LIMIT {ph}",
+                       [last_id, batch_size])
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        updates = []
+        for article_id, title, summary in rows:
+            signature = simhash(match_string(f"{title or ''} {summary or ''}"))
+            if signature is None:
+                updates.append((None, article_id, article_id))
+                continue
+            story_id = index.find(signature)
+            story_id = signature if story_id is None else story_id
+            index.add(signature, story_id)
+            updates.append((signature, story_id, article_id))
+        cursor.executemany(f"UPDATE articles SET simhash = {ph}, story_id = {ph} WHERE id = {ph}",
+                           updates)
+        conn.commit()
+        last_id = rows[-1][0]
+
 
-                combined_text = title + " " + summary
-
-                # Identity tags (women / lgbtqia+) — locale-aware
-                identity_tags = get_identity_tags(combined_text, source_name, locale)
-                tags_str = ", ".join(identity_tags) if identity_tags else "general"
-
-                # Category field (legacy — kept for backward compat)
-                category = "lgbtqia+" if "lgbtqia+" in identity_tags else "women"
-
-                # System topics (new taxonomy) — locale-aware
-                system_topics = get_system_topics(combined_text, source_name, locale)
-                topics_str = ", ".join(system_topics) if system_topics else ""
-
-                # Publication date + paywall — locale-aware
-                published_at = extract_published_at(entry)
-                is_paywalled = detect_paywall(entry, source_name, locale)
-                scraped_at   = datetime.now(timezone.utc).isoformat()
-
-                if USE_SUPABASE:
-                    batch_rows.append({
-                        "url_hash":    hash_id,
-                        "title":       title,
-                        "link":        link,
-                        "summary":     summary,
-                        "source":      source_name,
-                        "country":     country,
-                        "category":    category,
-                        "tags":        tags_str,
-                        "topics":      topics_str,
-                        "scraped_at":  scraped_at,
-                        "published_at": published_at if published_at else None,
-                        "is_paywalled": is_paywalled,
-                        "locale":      locale,
-                    })
+# ─────────────────────────────────────────────────────────────────────────────
+#  STREAMING FEED PARSER  — RSS 2.0 / Atom entries, stopping at the cap
+# ─────────────────────────────────────────────────────────────────────────────
+ATOM_NS    = "{http://www.w3.org/2005/Atom}"
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+DC_NS      = "{http://purl.org/dc/elements/1.1/}"
+
+
+class FeedEntry(dict):
+    """Minimal feedparser-style entry: a dict whose keys are also attributes."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def _parse_feed_date(text):
+    """RFC 822 (RSS) or ISO 8601 (Atom, dc:date) → UTC struct_time, like feedparser."""
+    from email.utils import parsedate_to_datetime
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        parsed = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).timetuple()
+
+
+def _element_text(elem):
+    # Atom type="xhtml" wraps markup in a <div>: keep the text, like strip_html would
+    if elem is None:
+        return None
+    return "".join(elem.itertext()).strip()
+
+
+class FeedStreamParser:
+    """
+    Incremental RSS 2.0 / Atom parser. feed() it bytes as they arrive; once
+    .done, .entries holds up to `limit` feedparser-style entries (title,
+    link, summary, published_parsed / updated_parsed). Any other root element
+    or malformed XML sets .failed, so the caller can hand the whole document
+    to feedparser instead.
+    """
+
+    def __init__(self, limit=None, base_url=""):
+        self.limit    = MAX_ARTICLES_PER_SOURCE if limit is None else limit
+        self.base_url = base_url
+        self.entries  = []
+        self.kind     = None
+        self.done     = False
+        self.failed   = False
+        from xml.etree import ElementTree
+        self._parser  = ElementTree.XMLPullParser(events=("start", "end"))
+        self._error   = ElementTree.ParseError
+        self._depth   = 0
+
+    def feed(self, data):
+        if self.done or self.failed:
+            return
+        try:
+            self._parser.feed(data)
+            self._read_events()
+        except self._error:
+            self.failed = True
+
+    def close(self):
+        """End of document: whatever was parsed so far is the whole feed."""
+        if self.done or self.failed:
+            return
+        try:
+            self._parser.close()
+            self._read_events()
+        except self._error:
+            self.failed = True
+            return
+        self.done = self.kind is not None
+
+    def _read_events(self):
+        entry_tag = None
+        for event, elem in self._parser.read_events():
+            if self.kind is None:
+                if elem.tag == "rss":
+                    self.kind = "rss"
+                elif elem.tag == f"{ATOM_NS}feed":
+                    self.kind = "atom"
                 else:
-                    try:
-                        cursor.execute(f"""
-                            INSERT INTO articles
-                              (url_hash, title, link, summary, source, country,
-                               category, tags, topics, scraped_at, published_at,
-                               is_paywalled, locale)
-                            VALUES ({ph},{ph},{ph},{ph},{ph},{ph},{ph},{ph},{ph},{ph},{ph},{ph},{ph})
-                        """, (
-                            hash_id, title, link, summary, source_name, country,
-                            category, tags_str, topics_str, scraped_at, published_at,
-                            is_paywalled, locale,
-                        ))
-                        new_count += 1
-                    except Exception:
-                        if USE_POSTGRES:
-                            conn.rollback()
-
-            # ── Flush to Supabase in one batch per source ──────────────────
-            if USE_SUPABASE and batch_rows:
-                try:
-                    _supabase.table("articles").upsert(
-                        batch_rows, ignore_duplicates=True
-                    ).execute()
-                    new_count = len(batch_rows)
-                except Exception as e:
-                    print(f"     ⚠️  Supabase upsert error for {source_name}: {e}", flush=True)
-
-            if conn:
-                conn.commit()
-            print(f"     ✔  {new_count} new articles from {source_name}", flush=True)
-            total_new += new_count
+                    self.failed = True
+                    return
+            entry_tag = "item" if self.kind == "rss" else f"{ATOM_NS}entry"
+            if elem.tag != entry_tag:
+                continue
+            if event == "start":
+                self._depth += 1
+                continue
+            self._depth -= 1
+            if self._depth:
+                continue    # an <item> nested in an <item>: part of the outer one
+            self.entries.append(self._rss_entry(elem) if self.kind == "rss" else self._atom_entry(elem))
+            elem.clear()
+            if len(self.entries) >= self.limit:
+                self.done = True
+                return
+
+    def _rss_entry(self, item):
+        entry = FeedEntry()
+        if item.find("title") is not None:
+            entry["title"] = _element_text(item.find("title"))
+        link = item.findtext("link")
+        guid = item.find("guid")
+        if not (link or "").strip() and guid is not None and guid.get("isPermaLink", "true") != "false":
+            link = guid.text
+        if (link or "").strip():
+            entry["link"] = urllib.parse.urljoin(self.base_url, link.strip())
+        summary = item.find("description")
+        if summary is None:
+            summary = item.find(f"{CONTENT_NS}encoded")
+        if summary is not None:
+            entry["summary"] = (summary.text or "").strip()
+        published = _parse_feed_date(item.findtext("pubDate") or item.findtext(f"{DC_NS}date"))
+        if published:
+            entry["published_parsed"] = published
+        return entry
+
+    def _atom_entry(self, elem):
+        entry = FeedEntry()
+        if elem.find(f"{ATOM_NS}title") is not None:
+            entry["title"] = _element_text(elem.find(f"{ATOM_NS}title"))
+        links = elem.findall(f"{ATOM_NS}link")
+        alternate = [l for l in links if l.get("rel", "alternate") == "alternate"] or links
+        if alternate and alternate[0].get("href"):
+            entry["link"] = urllib.parse.urljoin(self.base_url, alternate[0].get("href").strip())
+        summary = elem.find(f"{ATOM_NS}summary")
+        if summary is None:
+            summary = elem.find(f"{ATOM_NS}content")
+        if summary is not None:
+            entry["summary"] = _element_text(summary) if summary.get("type") == "xhtml" \
+                else (summary.text or "").strip()
+        for tag, key in (("published", "published_parsed"), ("updated", "updated_parsed")):
+            parsed = _parse_feed_date(elem.findtext(f"{ATOM_NS}{tag}"))
+            if parsed:
+                entry[key] = parsed
+        return entry
+
+
+def parse_feed_entries(body, headers):
+    """
+    Up to MAX_ARTICLES_PER_SOURCE entries from a complete (or already capped)
+    feed document: streaming parser first, feedparser for anything it can't read.
+    """
+    if STREAM_FEEDS:
+        stream = FeedStreamParser(base_url=headers.get("content-location", ""))
+        for start in range(0, len(body), STREAM_CHUNK):
+            stream.feed(body[start:start + STREAM_CHUNK])
+            if stream.done or stream.failed:
+                break
+        stream.close()
+        if stream.done:
+            return stream.entries
+    import feedparser
+    return feedparser.parse(body, response_headers=headers).entries[:MAX_ARTICLES_PER_SOURCE]
+
+
+def _read_streaming(resp, content_encoding, stream, drain=False):
+    """
+    Read an HTTP response in chunks, feeding the decoded bytes to stream
+    (at most STREAM_CHUNK at a time, gzip included) and stopping as soon as
+    it has enough entries. Returns (wire bytes read, body so far); the body
+    is complete unless stream.done cut it short. With drain, the rest of the
+    response is still read and decoded (not parsed), so the body is whole.
+    """
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS) if content_encoding == "gzip" else None
+    wire, parts, chunk = 0, [], b""
+    while not stream.done:
+        chunk = resp.read(STREAM_CHUNK)
+        if not chunk:
+            if decoder:
+                parts.append(decoder.flush())
+                stream.feed(parts[-1])
+            stream.close()
+            break
+        wire += len(chunk)
+        while chunk and not stream.done:
+            data  = decoder.decompress(chunk, STREAM_CHUNK) if decoder else chunk
+            chunk = decoder.unconsumed_tail if decoder else b""
+            parts.append(data)
+            stream.feed(data)
+    if drain and stream.done:
+        rest   = resp.read()
+        wire  += len(rest)
+        rest   = chunk + rest       # chunk: input the decoder had not consumed yet
+        parts += [decoder.decompress(rest), decoder.flush()] if decoder else [rest]
+    return wire, b"".join(parts)
 
-        except Exception as e:
-            print(f"     ❌  Error scraping {source_name}: {e}", flush=True)
-        finally:
-            if conn:
-                conn.close()
 
-    print(f"\n🎉 Done! {total_new} new articles saved in total.", flush=True)
+# ─────────────────────────────────────────────────────────────────────────────
+#  FETCHING  — network I/O runs in a thread pool, one slot per host at a time
+# ─────────────────────────────────────────────────────────────────────────────
+def _decode_body(raw, content_encoding):
+    encoding = (content_encoding or "").lower()
+    if encoding == "gzip":
+        return zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:
+            return zlib.decompress(raw, -zlib.MAX_WBITS)
+    return raw
+
+
+def _fetch_feed(feed_url, host_slot, state=None, full_body=False):
+    """
+    GET one feed, sending If-None-Match / If-Modified-Since when we have
+    validators from a previous run. Returns a dict with status, lower-cased
+    response headers, the decoded body, the bytes read off the wire and the
+    full response size (content_length). The streaming parser may stop
+    reading at the cap; full_body (used by --record) reads the rest anyway.
+    """
+    headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+    if state and state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state and state.get("last_modified"):
+        headers["If-Modified-Since"] = state["last_modified"]
+    import urllib.error
+    import urllib.request
+    request = urllib.request.Request(feed_url, headers=headers)
+
+    stream = None
+    with host_slot:
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as resp:
+                status       = resp.status
+                resp_headers = {k.lower(): v for k, v in resp.headers.items()}
+                encoding     = (resp_headers.pop("content-encoding", None) or "").lower()
+                if STREAM_FEEDS and encoding in ("", "identity", "gzip"):
+                    stream = FeedStreamParser(base_url=resp_headers.get("content-location", feed_url))
+                    wire, body = _read_streaming(resp, encoding, stream, drain=full_body)
+                else:
+                    raw  = resp.read()
+                    wire = len(raw)
+                    body = _decode_body(raw, encoding)
+                # Cut short by the stream parser: the header has the real size
+                length = wire
+                header = resp_headers.get("content-length", "")
+                if stream and stream.done and not full_body and header.isdigit():
+                    length = max(wire, int(header))
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            return {"status": 304, "headers": {k.lower(): v for k, v in e.headers.items()},
+                    "body": b"", "bytes": 0, "content_length": 0,
+                    "seconds": time.perf_counter() - started}
+        elapsed = time.perf_counter() - started
+
+    resp_headers.setdefault("content-location", feed_url)
+    return {"status": status, "headers": resp_headers, "body": body, "bytes": wire,
+            "content_length": length, "seconds": elapsed, "entries": stream.entries if stream and stream.done else None}
+
+
+# ── Record / replay ──────────────────────────────────────────────────────────
+# --record DIR saves every fetched feed as <key>.json (url, status, headers,
+# wire bytes, fetch time or error) plus <key>.body (decoded payload).
+# --replay DIR serves those files instead of the network, through the same
+# host slots, optionally sleeping a fixed latency (or the recorded fetch time)
+# per feed so concurrency changes can be measured offline.
+def _recording_paths(directory, feed_url):
+    key = hashlib.sha1(feed_url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, f"{key}.json"), os.path.join(directory, f"{key}.body")
+
+
+def _fetch_and_record(record_dir, feed_url, host_slot, state=None):
+    meta_path, body_path = _recording_paths(record_dir, feed_url)
+    started = time.perf_counter()
+    try:
+        fetched = _fetch_feed(feed_url, host_slot, state, full_body=True)
+    except Exception as e:
+        meta = {"feed_url": feed_url, "error": f"{type(e).__name__}: {e}",
+                "elapsed": time.perf_counter() - started}
+        with open(meta_path, "w") as f:
+            json.dump(meta, f, indent=1)
+        raise
+    with open(body_path, "wb") as f:
+        f.write(fetched["body"])
+    with open(meta_path, "w") as f:
+        json.dump({"feed_url": feed_url, "status": fetched["status"], "headers": fetched["headers"],
+                   "bytes": fetched["bytes"], "elapsed": time.perf_counter() - started}, f, indent=1)
+    return fetched
+
+
+def _replay_feed(replay_dir, latency, feed_url, host_slot, state=None):
+    """Serve a recorded response; latency is seconds or "recorded"."""
+    meta_path, body_path = _recording_paths(replay_dir, feed_url)
+    with open(meta_path) as f:
+        meta = json.load(f)
+    with host_slot:
+        started = time.perf_counter()
+        time.sleep(meta.get("elapsed", 0.0) if latency == "recorded" else float(latency or 0))
+        elapsed = time.perf_counter() - started
+    if "error" in meta:
+        raise OSError(f"(recorded) {meta['error']}")
+    with open(body_path, "rb") as f:
+        body = f.read()
+    return {"status": meta["status"], "headers": meta["headers"], "body": body,
+            "bytes": meta["bytes"], "seconds": elapsed}
+
+
+def fetch_all_feeds(pool, feeds, feed_state=None, per_host=FETCH_PER_HOST,
+                    record_dir=None, replay_dir=None, replay_latency=0.0):
+    """Submit every feed to the pool; return {source: Future} in feed order."""
+    feed_state = feed_state or {}
+    host_slots = {}
+    futures    = {}
+    if replay_dir:
+        fetch = functools.partial(_replay_feed, replay_dir, replay_latency)
+    elif record_dir:
+        os.makedirs(record_dir, exist_ok=True)
+        fetch = functools.partial(_fetch_and_record, record_dir)
+    else:
+        fetch = _fetch_feed
+    for source_name, feed_info in feeds.items():
+        feed_url = feed_info["url"]
+        host     = urllib.parse.urlparse(feed_url).hostname or ""
+        if host not in host_slots:
+            host_slots[host] = threading.BoundedSemaphore(max(1, per_host))
+        futures[source_name] = pool.submit(
+            fetch, feed_url, host_slots[host], feed_state.get(feed_url)
+        )
+    return futures
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  SCRAPING
+# ─────────────────────────────────────────────────────────────────────────────
+def scrape_all_feeds(workers=FETCH_WORKERS, conditional=True, scheduled=True,
+                     record_dir=None, replay_dir=None, replay_latency=0.0,
+                     metrics_file=None, prometheus_file=None):
+    """
+    Fetch all feeds concurrently (workers=1 fetches one at a time), then parse,
+    classify and store them one source at a time in FEEDS order, so per-source
+    counts and log lines are the same as a sequential run.
+
+    With conditional=True, feeds are requested with the ETag / Last-Modified
+    validators from the previous run; a 304 skips parsing and classification.
+    With scheduled=True, only the feeds due per their adaptive schedule are
+    fetched (see schedule_feed / due_feeds).
+    record_dir / replay_dir save or serve full responses (see _replay_feed);
+    both imply conditional=False and scheduled=False, so recordings hold
+    complete bodies of every feed and a replay leaves feed_state untouched.
+
+    Per-source stage metrics are summarised at the end and written to
+    metrics_file / prometheus_file (defaults: METRICS_FILE / PROMETHEUS_FILE).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    replaying   = bool(record_dir or replay_dir)
+    conditional = conditional and not replaying
+    scheduled   = scheduled and not replaying
+    feed_state  = load_feed_state() if conditional or scheduled else {}
+    feeds       = due_feeds(feed_state) if scheduled else FEEDS
+    if not feeds:
+        # Nothing to fetch: skip the known-hash and story-index scans entirely
+        print(f"\n⏰ None of the {len(FEEDS)} feeds are due yet — nothing to fetch.", flush=True)
+        return
+
+    run = {
+        "total_new": 0, "unchanged": 0, "bytes_saved": 0, "bytes_read": 0, "updated": [],
+        "known": load_known_hashes(), "already_stored": 0, "stories": load_story_index(),
+        # SQLite / Postgres: one connection for the whole run. SQLite commits
+        # every SQLITE_COMMIT_ROWS inserted rows, Postgres once per source.
+        "conn": acquire_connection() if not USE_SUPABASE else None,
+        "pending": 0, "metrics": [],
+    }
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = fetch_all_feeds(pool, feeds, feed_state if conditional else {},
+                                      record_dir=record_dir, replay_dir=replay_dir,
+                                      replay_latency=replay_latency)
+            for source_name, feed_info in feeds.items():
+                _store_feed(source_name, feed_info, futures[source_name],
+                            feed_state.get(feed_info["url"]), run)
+    finally:
+        if run["conn"]:
+            run["conn"].commit()
+            release_connection(run["conn"])
+        bump_scrape_generation()
+
+    if conditional or scheduled:
+        save_feed_state(run["updated"])
+
+    print(f"\n🎉 Done! {run['total_new']} new articles saved in total.", flush=True)
+    if scheduled:
+        print(f"   ⏰ {len(FEEDS) - len(feeds)} of {len(FEEDS)} feeds not due yet — skipped.",
+              flush=True)
+    print(f"   ⏭  {run['already_stored']} entries already stored — skipped before classification.",
+          flush=True)
+    print(f"   ↺  {run['unchanged']} feeds unchanged since last run — "
+          f"{run['bytes_saved'] / 1024:.0f} KB saved, "
+          f"{run['bytes_read'] / 1024:.0f} KB downloaded.", flush=True)
+
+    summary = summarize_metrics(run["metrics"])
+    _print_metrics_summary(summary)
+    metrics_file    = METRICS_FILE if metrics_file is None else metrics_file
+    prometheus_file = PROMETHEUS_FILE if prometheus_file is None else prometheus_file
+    try:
+        if metrics_file:
+            write_metrics_jsonl(metrics_file, run["metrics"], summary)
+        if prometheus_file:
+            write_prometheus_textfile(prometheus_file, run["metrics"], summary)
+    except OSError as e:
+        print(f"  ⚠️  Could not write metrics (non-fatal): {e}", flush=True)
+
+
+def _store_feed(source_name, feed_info, fetched, state, run):
+    """Parse, classify and store one source's entries into the run totals."""
+    feed_url = feed_info["url"]
+    country  = feed_info["country"]
+    locale   = feed_info.get("locale", "en")
+    print(f"  📡 Scraping [{locale.upper()}]: {source_name}...", flush=True)
+    metrics = {"source": source_name, "locale": locale, "status": None, "fetch_seconds": 0.0,
+               "bytes": 0, "parse_seconds": 0.0, "entries": 0, "already_stored": 0,
+               "gate_pass": 0, "gate_reject": 0, "story_members": 0, "classify_seconds": 0.0,
+               "write_seconds": 0.0, "inserted": 0, "duplicates": 0, "error": None}
+    run["metrics"].append(metrics)
+
+    try:
+        response = fetched.result()
+    except Exception as e:
+        metrics["error"] = str(e)
+        print(f"     ❌  Error scraping {source_name}: {e}", flush=True)
+        return
+
+    checked = datetime.now(timezone.utc)
+    now     = checked.isoformat()
+    run["bytes_read"] += response["bytes"]
+    metrics.update(status=response["status"], bytes=response["bytes"],
+                   fetch_seconds=response.get("seconds", 0.0))
+    if response["status"] == 304:
+        run["unchanged"]   += 1
+        run["bytes_saved"] += (state or {}).get("content_length") or 0
+        run["updated"].append({**(state or {"feed_url": feed_url}), "checked_at": now,
+                               **schedule_feed(state, checked)})
+        print(f"     ✔  0 new articles from {source_name} (not modified)", flush=True)
+        return
+
+    try:
+        started = time.perf_counter()
+        entries = response.get("entries")
+        if entries is None:
+            entries = parse_feed_entries(response["body"], response["headers"])
+        rows    = []
+        metrics.update(parse_seconds=time.perf_counter() - started, entries=len(entries))
+
+        for entry in entries:
+            link    = entry.get("link", "")
+            hash_id = url_hash(link)
+
+            # Already stored on a previous run (or by another source this run)
+            if hash_id in run["known"]:
+                run["already_stored"] += 1
+                metrics["already_stored"] += 1
+                continue
+
+            # Inclusion gate, identity tags, system topics and paywall flag —
+            # locale-aware, one pass; the gate is skipped for always-include
+            # sources. A kept near-duplicate of a stored story joins that story.
+            started = time.perf_counter()
+            norm    = normalize_entry(entry)
+            result  = classify_entry(norm, source_name, locale)
+            if not result["keep"]:
+                metrics["classify_seconds"] += time.perf_counter() - started
+                metrics["gate_reject"] += 1
+                continue
+            signature = simhash(norm.match)
+            story_id  = None
+            if signature is not None:
+                story_id = run["stories"].find(signature)
+                if story_id is None:
+                    story_id = signature
+                else:
+                    metrics["story_members"] += 1
+                run["stories"].add(signature, story_id)
+            metrics["classify_seconds"] += time.perf_counter() - started
+            metrics["gate_pass"] += 1
+
+            run["known"].add(hash_id)
+            rows.append({
+                "url_hash":     hash_id,
+                "title":        result["title"],
+                "link":         link,
+                "summary":      result["summary"],
+                "source":       source_name,
+                "country":      country,
+                "category":     result["category"],
+                "tags":         result["tags"],
+                "topics":       result["topics"],
+                "scraped_at":   datetime.now(timezone.utc).isoformat(),
+                "published_at": extract_published_at(entry),
+                "is_paywalled": result["is_paywalled"],
+                "locale":       locale,
+                "taxonomy_version": TAXONOMY_VERSION,
+                "topic_mask":   result["topic_mask"],
+                "simhash":      signature,
+                "story_id":     story_id,
+            })
+
+        started = time.perf_counter()
+        try:
+            new_count = write_articles(rows, source_name, run)
+        except Exception:
+            # Nothing was stored and the feed's validators / schedule are not
+            # saved, so the next fetch gets these entries again and retries
+            run["known"].difference_update(row["url_hash"] for row in rows)
+            raise
+        metrics.update(write_seconds=time.perf_counter() - started, inserted=new_count,
+                       duplicates=len(rows) - new_count)
+        print(f"     ✔  {new_count} new articles from {source_name}", flush=True)
+        run["total_new"] += new_count
+        run["updated"].append({
+            "feed_url":       feed_url,
+            "etag":           response["headers"].get("etag"),
+            "last_modified":  response["headers"].get("last-modified"),
+            "content_length": response.get("content_length", response["bytes"]),
+            "checked_at":     now,
+            **schedule_feed(state, checked, [extract_published_at(e) for e in entries],
+                            len(entries)),
+        })
+
+    except Exception as e:
+        metrics["error"] = str(e)
+        print(f"     ❌  Error scraping {source_name}: {e}", flush=True)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-#  RECATEGORIZE  — re-tag all existing articles with the new taxonomy
+#  METRICS  — per-source stage timings / counters from scrape_all_feeds
 # ─────────────────────────────────────────────────────────────────────────────
-def recategorize_all_articles():
-    """Re-run system topic + identity tag detection on every existing article."""
-    conn   = get_connection()
+METRIC_STAGES = ("fetch", "parse", "classify", "write")
+
+
+def _percentile(values, pct):
+    # Nearest-rank percentile; 0.0 for an empty list
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def summarize_metrics(metrics):
+    """p50 / p95 / max per stage across sources, plus run-wide counters."""
+    summary = {"sources": len(metrics), "errors": sum(1 for m in metrics if m["error"])}
+    for stage in METRIC_STAGES:
+        values = [m[f"{stage}_seconds"] for m in metrics if not m["error"]]
+        summary[stage] = {"p50": _percentile(values, 50), "p95": _percentile(values, 95),
+                          "max": max(values, default=0.0), "total": sum(values)}
+    for counter in ("bytes", "entries", "already_stored", "gate_pass", "gate_reject",
+                    "story_members", "inserted", "duplicates"):
+        summary[counter] = sum(m[counter] for m in metrics)
+    ok = [m for m in metrics if not m["error"]]
+    if ok:
+        slowest = max(ok, key=lambda m: sum(m[f"{stage}_seconds"] for stage in METRIC_STAGES))
+        summary["slowest_source"] = slowest["source"]
+    return summary
+
+
+def _print_metrics_summary(summary):
+    stages = " · ".join(f"{stage} p50 {summary[stage]['p50'] * 1000:.0f}ms "
+                        f"p95 {summary[stage]['p95'] * 1000:.0f}ms" for stage in METRIC_STAGES)
+    print(f"   ⏱  {stages}", flush=True)
+    print(f"   🔎 {summary['gate_pass']} entries passed the gate, {summary['gate_reject']} rejected; "
+          f"{summary['story_members']} joined an existing story; "
+          f"{summary['duplicates']} duplicates at write; {summary['errors']} source(s) failed"
+          + (f"; slowest: {summary['slowest_source']}" if summary.get("slowest_source") else "")
+          + ".", flush=True)
+
+
+def write_metrics_jsonl(path, metrics, summary):
+    """Append one line per source plus a summary line, all tagged with the run time."""
+    run_at = datetime.now(timezone.utc).isoformat()
+    with open(path, "a") as f:
+        for m in metrics:
+            f.write(json.dumps({"type": "source", "run_at": run_at, **m}, ensure_ascii=False) + "\n")
+        f.write(json.dumps({"type": "summary", "run_at": run_at, **summary}, ensure_ascii=False) + "\n")
+
+
+def _prom_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(metrics, summary, finished_at=None):
+    """Per-source metrics and the run summary in Prometheus text format."""
+    gauges = [
+        ("fetch_seconds", "Feed fetch time"), ("bytes", "Response bytes read"),
+        ("status", "HTTP status of the feed response"), ("parse_seconds", "Feed parse time"),
+        ("entries", "Entries parsed (capped at MAX_ARTICLES_PER_SOURCE)"),
+        ("already_stored", "Entries skipped as already stored"),
+        ("gate_pass", "Entries that passed the inclusion gate"),
+        ("gate_reject", "Entries rejected by the inclusion gate"),
+        ("story_members", "Entries that joined a stored near-duplicate story"),
+        ("classify_seconds", "Classification time"), ("write_seconds", "Database write time"),
+        ("inserted", "Rows inserted"), ("duplicates", "Rows skipped as duplicates at write"),
+    ]
+    lines = []
+    for key, help_text in gauges:
+        lines += [f"# HELP scraper_source_{key} {help_text}, per source, last run.",
+                  f"# TYPE scraper_source_{key} gauge"]
+        lines += [f'scraper_source_{key}{{source="{_prom_label(m["source"])}"}} {m[key] or 0}'
+                  for m in metrics]
+    lines += ["# HELP scraper_source_up 1 if the source was fetched and stored without error.",
+              "# TYPE scraper_source_up gauge"]
+    lines += [f'scraper_source_up{{source="{_prom_label(m["source"])}"}} {0 if m["error"] else 1}'
+              for m in metrics]
+    lines += ["# HELP scraper_stage_seconds Stage time across sources, last run.",
+              "# TYPE scraper_stage_seconds gauge"]
+    for stage in METRIC_STAGES:
+        for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("1", "max")):
+            lines.append(f'scraper_stage_seconds{{stage="{stage}",quantile="{quantile}"}} '
+                         f'{summary[stage][key]}')
+    lines += ["# HELP scraper_last_run_timestamp_seconds Unix time the last run finished.",
+              "# TYPE scraper_last_run_timestamp_seconds gauge",
+              f"scraper_last_run_timestamp_seconds {finished_at or time.time():.0f}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(path, metrics, summary):
+    """
+    Write the last run as Prometheus text format (for node_exporter's
+    textfile collector). Written to a temp file and renamed, so a scrape
+    never sees a half-written file.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text(metrics, summary))
+    os.replace(tmp_path, path)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  WRITING  — one source's rows per call, per backend
+# ─────────────────────────────────────────────────────────────────────────────
+ARTICLE_COLUMNS = (
+    "url_hash", "title", "link", "summary", "source", "country",
+    "category", "tags", "topics", "scraped_at", "published_at",
+    "is_paywalled", "locale", "taxonomy_version", "topic_mask", "simhash", "story_id",
+)
+
+# SQLite ingest commits once per this many inserted rows (and at end of run)
+SQLITE_COMMIT_ROWS = 500
+
+
+def write_articles(rows, source_name, run):
+    """Store one source's new rows; return how many were actually inserted."""
+    if not rows:
+        return 0
+    if USE_SUPABASE:
+        return _insert_articles_supabase(rows)
+
+    # New rows get ids above the current maximum (single writer), which is
+    # how their article_topics rows are found without a round trip per row.
+    conn   = run["conn"]
     cursor = conn.cursor()
     ph     = "%s" if USE_POSTGRES else "?"
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM articles")
+    last_id = cursor.fetchone()[0]
 
-    cursor.execute("SELECT id, title, summary, source, locale FROM articles")
-    rows    = cursor.fetchall()
-    updated = 0
+    if USE_POSTGRES:
+        try:
+            inserted = _insert_articles_postgres(conn, rows)
+            sync_article_topics(cursor, f"a.id > {ph}", [last_id])
+            apply_article_stats(cursor, f"a.id > {ph}", [last_id])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return inserted
+
+    # One transaction spans several sources (committed every
+    # SQLITE_COMMIT_ROWS); a savepoint per source lets a failed source undo
+    # just its own rows, topic rows and rollup counts
+    if not conn.in_transaction:
+        conn.execute("BEGIN")
+    conn.execute("SAVEPOINT write_source")
+    try:
+        inserted = _insert_articles_sqlite(conn, rows, last_id)
+        sync_article_topics(cursor, f"a.id > {ph}", [last_id])
+        apply_article_stats(cursor, f"a.id > {ph}", [last_id])
+    except Exception:
+        conn.execute("ROLLBACK TO write_source")
+        conn.execute("RELEASE write_source")
+        raise
+    conn.execute("RELEASE write_source")
+    run["pending"] += inserted
+    if run["pending"] >= SQLITE_COMMIT_ROWS:
+        run["conn"].commit()
+        run["pending"] = 0
+    return inserted
+
+
+def _insert_articles_sqlite(conn, rows, last_id):
+    # INSERT OR IGNORE skips url_hash duplicates without raising. New rows
+    # are exactly those above last_id (total_changes would also count the
+    # FTS trigger writes).
+    conn.executemany(f"""
+        INSERT OR IGNORE INTO articles ({', '.join(ARTICLE_COLUMNS)})
+        VALUES ({', '.join(['?'] * len(ARTICLE_COLUMNS))})
+    """, [tuple(row[col] for col in ARTICLE_COLUMNS) for row in rows])
+    return conn.execute("SELECT COUNT(*) FROM articles WHERE id > ?", [last_id]).fetchone()[0]
+
+
+def _insert_articles_postgres(conn, rows):
+    # Multi-row INSERT ... ON CONFLICT DO NOTHING: one round trip per chunk,
+    # RETURNING yields exactly the rows that were new (pg8000 and psycopg2).
+    cursor   = conn.cursor()
+    row_sql  = "(" + ", ".join(["%s"] * len(ARTICLE_COLUMNS)) + ")"
+    inserted = 0
+    for i in range(0, len(rows), PG_INSERT_CHUNK):
+        chunk  = rows[i:i + PG_INSERT_CHUNK]
+        params = [row[col] for row in chunk for col in ARTICLE_COLUMNS]
+        cursor.execute(f"""
+            INSERT INTO articles ({', '.join(ARTICLE_COLUMNS)})
+            VALUES {', '.join([row_sql] * len(chunk))}
+            ON CONFLICT (url_hash) DO NOTHING
+            RETURNING id
+        """, params)
+        inserted += len(cursor.fetchall())
+    return inserted
+
+
+def _insert_articles_supabase(rows):
+    # Flush to Supabase in one batch per source
+    # Errors propagate, so _store_feed keeps the feed's old validators
+    batch_rows = [{**row, "url_hash": url_hash_hex(row["url_hash"]),
+                   "published_at": row["published_at"] or None} for row in rows]
+    # ON CONFLICT (url_hash) DO NOTHING: only the rows actually inserted come back
+    inserted = _supabase_client().table("articles").upsert(
+        batch_rows, on_conflict="url_hash", ignore_duplicates=True
+    ).execute().data or []
+    return len(inserted)
 
-    for row in rows:
-        article_id, title, summary, source = row[0], row[1], row[2], row[3]
-        locale = row[4] if len(row) > 4 and row[4] else "en"
-        text = (title or "") + " " + (summary or "")
 
-        # New system topics — locale-aware
-        system_topics = get_system_topics(text, source, locale)
-        topics_str = ", ".join(system_topics) if system_topics else ""
+# ─────────────────────────────────────────────────────────────────────────────
+#  RECATEGORIZE  — re-tag existing articles with the current taxonomy
+# ─────────────────────────────────────────────────────────────────────────────
+RECATEGORIZE_BATCH = ID_BATCH
+
+
+def recategorize_all_articles(force=False, batch_size=RECATEGORIZE_BATCH, workers=1):
+    """
+    Re-run system topic + identity tag detection on existing articles.
+
+    Streams rows in id order, batch_size at a time, committing per batch so
+    memory and transaction size stay flat. Only rows whose taxonomy_version
+    differs from TAXONOMY_VERSION are read (all rows with force=True), and
+    only rows whose topics/tags actually change are rewritten; the rest just
+    get their version stamp bumped.
 
-        # Identity tags — locale-aware
-        identity_tags = get_identity_tags(text, source, locale)
-        tags_str = ", ".join(identity_tags) if identity_tags else "general"
+    With workers > 1 each batch (a contiguous id range) is classified in a
+    process pool — every worker builds its keyword automata once, on first
+    use — while this process stays the single reader and writer.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    conn   = acquire_connection()
+    cursor = conn.cursor()
+    ph     = "%s" if USE_POSTGRES else "?"
+
+    query = (f"SELECT id, title, summary, source, locale, topics, tags, topic_mask "
+             f"FROM articles WHERE id > {ph}")
+    if not force:
+        query += f" AND (taxonomy_version IS NULL OR taxonomy_version <> {ph})"
+    query += f" ORDER BY id LIMIT {ph}"
+
+    def read_batches():
+        last_id = 0
+        while True:
+            params = [last_id] + ([] if force else [TAXONOMY_VERSION]) + [batch_size]
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield rows
+
+    totals = {"checked": 0, "changed": 0}
+
+    def write(updates, unchanged_ids):
+        _write_recategorized(cursor, updates, unchanged_ids)
+        conn.commit()
+        totals["checked"] += len(updates) + len(unchanged_ids)
+        totals["changed"] += len(updates)
 
+    started = time.perf_counter()
+    try:
+        if workers <= 1:
+            for rows in read_batches():
+                write(*_classify_batch(rows))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                in_flight = set()
+                for rows in read_batches():
+                    # Bound the queue so memory stays flat however big the table
+                    if len(in_flight) >= workers * 2:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            write(*future.result())
+                    in_flight.add(pool.submit(_classify_batch, rows))
+                for future in in_flight:
+                    write(*future.result())
+    finally:
+        release_connection(conn)
+        bump_scrape_generation()
+
+    elapsed = time.perf_counter() - started
+    checked, changed = totals["checked"], totals["changed"]
+    print(f"✅ Recategorized {checked} articles with taxonomy {TAXONOMY_VERSION} "
+          f"({changed} changed, {checked - changed} unchanged) in {elapsed:.1f}s — "
+          f"{checked / elapsed if elapsed else 0:.0f} articles/s with {max(1, workers)} worker(s).",
+          flush=True)
+    return {**totals, "seconds": elapsed}
+
+
+def _classify_batch(rows):
+    """Classify (id, title, summary, source, locale, topics, tags, topic_mask) rows.
+
+    Returns ([(id, topics, tags, topic_mask), ...] for rows whose tags
+    changed, [ids of unchanged rows]). Module-level so a process pool can
+    pickle it.
+    """
+    updates, unchanged_ids = [], []
+    for row in rows:
+        article_id, title, summary, source = row[0], row[1], row[2], row[3]
+        locale = row[4] or "en"
+
+        # Same engine as ingest — locale-aware system topics + identity tags
+        result = classify_entry({"title": title or "", "summary": summary or ""}, source, locale)
+        new = (result["topics"], result["tags"], result["topic_mask"])
+        if new != (row[5] or "", row[6] or "", row[7]):
+            updates.append((article_id,) + new)
+        else:
+            unchanged_ids.append(article_id)
+    return updates, unchanged_ids
+
+
+def _write_recategorized(cursor, updates, unchanged_ids):
+    ph      = "%s" if USE_POSTGRES else "?"
+    ids     = [update[0] for update in updates]
+    changed = f"a.id IN ({', '.join([ph] * len(ids))})"
+    if updates:
+        apply_article_stats(cursor, changed, ids, sign=-1)
+    if updates and USE_POSTGRES:
+        # One statement per batch: UPDATE ... FROM (VALUES ...)
+        values = ", ".join(["(%s::integer, %s, %s, %s::integer)"] * len(updates))
+        cursor.execute(f"""
+            UPDATE articles AS a
+               SET topics = v.topics, tags = v.tags, topic_mask = v.topic_mask,
+                   taxonomy_version = %s
+              FROM (VALUES {values}) AS v(id, topics, tags, topic_mask)
+             WHERE a.id = v.id
+        """, [TAXONOMY_VERSION] + [value for update in updates for value in update])
+    elif updates:
+        cursor.executemany(
+            "UPDATE articles SET topics = ?, tags = ?, topic_mask = ?, taxonomy_version = ? "
+            "WHERE id = ?",
+            [(topics, tags, mask, TAXONOMY_VERSION, article_id)
+             for article_id, topics, tags, mask in updates]
+        )
+    if updates:
+        sync_article_topics(cursor, changed, ids)
+        apply_article_stats(cursor, changed, ids)
+    if unchanged_ids:
         cursor.execute(
-            f"UPDATE articles SET topics = {ph}, tags = {ph} WHERE id = {ph}",
-            (topics_str, tags_str, article_id)
+            f"UPDATE articles SET taxonomy_version = {ph} "
+            f"WHERE id IN ({', '.join([ph] * len(unchanged_ids))})",
+            [TAXONOMY_VERSION] + unchanged_ids
         )
-        updated += 1
 
-    conn.commit()
-    conn.close()
-    print(f"✅ Recategorized {updated} articles with new taxonomy.", flush=True)
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  STATS ROLLUP  — article_stats: per-day counts, one row per dimension value
+# ─────────────────────────────────────────────────────────────────────────────
+# Dimensions: "all" (value ''), source, country, locale and topic (system
+# topics + identity tags, read from topic_mask). Every insert, purge and
+# recategorization adjusts the rollup in its own transaction, so get_stats()
+# never touches articles. On Supabase, triggers in schema.sql do the same.
+ARTICLE_STATS_DDL = """
+    CREATE TABLE IF NOT EXISTS article_stats (
+        day       TEXT    NOT NULL,
+        dimension TEXT    NOT NULL,
+        value     TEXT    NOT NULL,
+        articles  INTEGER NOT NULL DEFAULT 0,
+        paywalled INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, dimension, value)
+    )
+"""
+STATS_DIMENSIONS = ("source", "country", "locale")
+
+
+def apply_article_stats(cursor, where, params, sign=1):
+    """Add (sign=1) or subtract (sign=-1) the articles matching `where` (alias a)."""
+    # The filter (and its parameters) appears once, in the CTE, so an id
+    # list of any length stays within SQLite's host-parameter limit
+    columns = ", ".join(("scraped_at", "paywall_override", "is_paywalled", "topic_mask")
+                        + STATS_DIMENSIONS)
+    day     = "substr(CAST(a.scraped_at AS TEXT), 1, 10)"
+    paid    = "CASE WHEN COALESCE(a.paywall_override, a.is_paywalled) THEN 1 ELSE 0 END"
+    selects = [f"SELECT {day} AS day, 'all' AS dimension, '' AS value, {paid} AS paid FROM picked a"]
+    selects += [f"SELECT {day}, '{dim}', COALESCE(a.{dim}, ''), {paid} FROM picked a"
+                for dim in STATS_DIMENSIONS]
+    selects.append(f"SELECT {day}, 'topic', t.name, {paid} FROM picked a "
+                   f"JOIN topic_ids t ON (a.topic_mask & (1 << t.id)) <> 0")
+    cursor.execute(f"""
+        WITH picked AS (SELECT {columns} FROM articles a WHERE {where})
+        INSERT INTO article_stats (day, dimension, value, articles, paywalled)
+        SELECT day, dimension, value, {sign} * COUNT(*), {sign} * SUM(paid)
+          FROM ({' UNION ALL '.join(selects)}) AS s
+         WHERE 1 = 1
+         GROUP BY day, dimension, value
+        ON CONFLICT (day, dimension, value) DO UPDATE
+           SET articles  = article_stats.articles  + excluded.articles,
+               paywalled = article_stats.paywalled + excluded.paywalled
+    """, list(params))
+    if sign < 0:
+        cursor.execute("DELETE FROM article_stats WHERE articles <= 0")
+
+
+def get_stats(since=None):
+    """
+    Article counts from the rollup alone: {"total", "paywalled", "by_day",
+    "by_source", "by_country", "by_locale", "by_topic", "by_tag"}, each by_*
+    mapping value → {"articles", "paywalled"}. since="YYYY-MM-DD" drops
+    earlier days. Cost depends on days × dimension values, not on articles.
+    """
+    if USE_SUPABASE:
+        query = _supabase_client().table("article_stats").select("*")
+        rows  = (query.gte("day", since) if since else query).execute().data or []
+    else:
+        ph   = "%s" if USE_POSTGRES else "?"
+        cols = ("day", "dimension", "value", "articles", "paywalled")
+        conn = acquire_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT day, dimension, value, articles, paywalled FROM article_stats"
+                           + (f" WHERE day >= {ph}" if since else ""), [since] if since else [])
+            rows = [dict(zip(cols, row)) for row in cursor.fetchall()]
+        finally:
+            release_connection(conn)
+
+    stats = {"total": 0, "paywalled": 0, "by_day": {}, "by_source": {}, "by_country": {},
+             "by_locale": {}, "by_topic": {}, "by_tag": {}}
+    for row in rows:
+        if row["dimension"] == "all":
+            stats["total"]     += row["articles"]
+            stats["paywalled"] += row["paywalled"]
+            bucket = stats["by_day"].setdefault(row["day"], {"articles": 0, "paywalled": 0})
+        elif row["dimension"] == "topic":
+            group  = "by_topic" if row["value"] in TOPIC_KEYWORDS else "by_tag"
+            bucket = stats[group].setdefault(row["value"], {"articles": 0, "paywalled": 0})
+        else:
+            bucket = stats[f"by_{row['dimension']}"].setdefault(
+                row["value"], {"articles": 0, "paywalled": 0})
+        bucket["articles"]  += row["articles"]
+        bucket["paywalled"] += row["paywalled"]
+    return stats
+
+
+def _supabase_select_all(table, columns, order, page_size=1000):
+    # order: a unique key, so pages neither skip nor repeat rows
+    rows, start = [], 0
+    while True:
+        query = _supabase_client().table(table).select(columns)
+        for column in order:
+            query = query.order(column)
+        page = query.range(start, start + page_size - 1).execute().data or []
+        rows += page
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+def rebuild_article_stats(verify=True):
+    """
+    Recompute article_stats from scratch, then (verify=True) recount from the
+    articles' own topics / tags strings and compare. Returns True if they agree.
+    """
+    stats_sql = "SELECT day, dimension, value, articles, paywalled FROM article_stats"
+    if USE_SUPABASE:
+        _supabase_client().rpc("rebuild_article_stats").execute()
+        if verify:
+            articles = [(r["scraped_at"], r["source"], r["country"], r["locale"], r["topics"],
+                         r["tags"], r["is_paywalled"] if r["paywall_override"] is None
+                         else r["paywall_override"])
+                        for r in _supabase_select_all(
+                            "articles", "scraped_at, source, country, locale, topics, tags, "
+                                        "is_paywalled, paywall_override", ("id",))]
+            stats = [(r["day"], r["dimension"], r["value"], r["articles"], r["paywalled"])
+                     for r in _supabase_select_all(
+                         "article_stats", "day, dimension, value, articles, paywalled",
+                         ("day", "dimension", "value"))]
+    else:
+        conn = acquire_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM article_stats")
+            apply_article_stats(cursor, "1 = 1", [])
+            conn.commit()
+            if verify:
+                cursor.execute("SELECT scraped_at, source, country, locale, topics, tags, "
+                               "COALESCE(paywall_override, is_paywalled) FROM articles")
+                articles = cursor.fetchall()
+                cursor.execute(stats_sql)
+                stats = cursor.fetchall()
+        finally:
+            release_connection(conn)
+
+    if not verify:
+        print("✅ article_stats rebuilt (not verified).", flush=True)
+        return True
+    expected = {}
+    for scraped_at, source, country, locale, topics, tags, paid in articles:
+        day  = str(scraped_at)[:10]
+        paid = 1 if paid and paid != "0" else 0
+        keys = [("all", ""), ("source", source or ""), ("country", country or ""),
+                ("locale", locale or "")]
+        names = split_taxonomy_names(topics)[0] + split_taxonomy_names(tags)[0]
+        keys += [("topic", name) for name in set(names)]
+        for dim, value in keys:
+            counts = expected.setdefault((day, dim, value), [0, 0])
+            counts[0] += 1
+            counts[1] += paid
+    actual = {(day, dim, value): [n, p] for day, dim, value, n, p in stats}
+    mismatched = {k for k in expected.keys() | actual.keys() if expected.get(k) != actual.get(k)}
+    ok = not mismatched
+    print(f"{'✅' if ok else '❌'} article_stats rebuilt: {len(actual)} rollup rows, "
+          f"{len(mismatched)} mismatched against articles.", flush=True)
+    return ok
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  READ CACHE
+# ─────────────────────────────────────────────────────────────────────────────
+# Entries are tagged with the generation they were read in; bumping it makes
+# every older entry a miss. Counters are process-wide, like the cache itself.
+_cache_lock       = threading.Lock()
+_article_cache    = OrderedDict()    # key → (generation, stored_at, rows)
+_cache_generation = 0
+_cache_counters   = {"hits": 0, "misses": 0}
+
+
+def bump_scrape_generation():
+    """Invalidate cached queries — call after committing new or changed articles."""
+    global _cache_generation
+    with _cache_lock:
+        _cache_generation += 1
+        _article_cache.clear()
+
+
+def article_cache_stats():
+    with _cache_lock:
+        return {**_cache_counters, "size": len(_article_cache),
+                "generation": _cache_generation}
+
+
+def _normalize_filters(kwargs):
+    # Strip text filters (blank → None) and coerce flags; the query and the
+    # cache key both see the result, so equal keys always mean equal queries
+    filters = dict(kwargs)
+    for name in ("category", "source", "search", "topic", "country", "locale"):
+        if isinstance(filters.get(name), str):
+            filters[name] = filters[name].strip() or None
+    filters["free_only"]        = bool(filters.get("free_only"))
+    filters["collapse_stories"] = bool(filters.get("collapse_stories"))
+    return filters
+
+
+def _cache_key(filters):
+    key = dict(filters)
+    if key.get("topic"):
+        known, other = split_taxonomy_names(key["topic"])
+        key["topic"] = (tuple(sorted(set(known))), tuple(sorted(set(other))))
+    key["after"] = tuple(key["after"]) if key.get("after") else None
+    return tuple(sorted(key.items()))
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  QUERY (kept for backward compatibility / standalone use)
 # ─────────────────────────────────────────────────────────────────────────────
+def _fts5_query(search):
+    # Every word must match, as a prefix; quoted so FTS5 syntax can't leak in
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", search))
+
+
+def _search_clause(cursor, search, locale):
+    """Return (join_sql, where_sql, params, rank_sql) for a full-text search."""
+    if USE_POSTGRES:
+        configs = {"de": ["german"], "en": ["english"]}.get(locale, ["english", "german"])
+        queries = [f"websearch_to_tsquery('{cfg}', %s)" for cfg in configs]
+        where   = " OR ".join(f"search_vector @@ {q}" for q in queries)
+        ranks   = [f"ts_rank(search_vector, {q})" for q in queries]
+        rank    = ranks[0] if len(ranks) == 1 else f"GREATEST({', '.join(ranks)})"
+        return "", f" AND ({where})", [search] * len(configs), (f"{rank} DESC", [search] * len(configs))
+
+    tables = [SQLITE_FTS_TABLES[locale][0]] if locale in SQLITE_FTS_TABLES else \
+             [table for table, _, _ in SQLITE_FTS_TABLES.values()]
+    placeholders = ", ".join(["?"] * len(tables))
+    cursor.execute(f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({placeholders})", tables)
+    fts_query = _fts5_query(search)
+    if cursor.fetchone()[0] < len(tables) or not fts_query:
+        # No FTS5 in this SQLite build — substring scan as before
+        return "", " AND (title LIKE ? OR summary LIKE ?)", [f"%{search}%"] * 2, None
+
+    # bm25(): lower is more relevant
+    matches = " UNION ALL ".join(
+        f"SELECT rowid AS fts_id, bm25({t}) AS fts_score FROM {t} WHERE {t} MATCH ?" for t in tables
+    )
+    join = f" JOIN ({matches}) AS fts ON fts.fts_id = articles.id"
+    return join, "", [fts_query] * len(tables), ("fts.fts_score", [])
+
+
 def get_all_articles(category=None, source=None, search=None, topic=None,
                      country=None, time_range=None, date_to=None,
-                     limit=200, free_only=False):
-    conn   = get_connection()
+                     limit=200, free_only=False, locale=None, sort="recent",
+                     after=None, collapse_stories=False):
+    """
+    Query stored articles, newest first. search uses the full-text index
+    (FTS5 / tsvector); sort="relevance" orders search results by rank.
+    after=(scraped_at, id) continues below that row — see get_articles_page.
+    collapse_stories=True returns one row per near-duplicate story (the first
+    matching member in sort order) with story_size = matching members.
+
+    Results are served from an in-process cache until the next scrape /
+    recategorization (or ARTICLE_CACHE_TTL); see article_cache_stats().
+    """
+    kwargs = _normalize_filters(dict(
+        category=category, source=source, search=search, topic=topic,
+        country=country, time_range=time_range, date_to=date_to, limit=limit,
+        free_only=free_only, locale=locale, sort=sort, after=after,
+        collapse_stories=collapse_stories))
+    if ARTICLE_CACHE_SIZE <= 0:
+        return _query_articles(**kwargs)
+
+    key = _cache_key(kwargs)
+    now = time.monotonic()
+    with _cache_lock:
+        generation = _cache_generation
+        entry      = _article_cache.get(key)
+        if entry and entry[0] == generation and now - entry[1] < ARTICLE_CACHE_TTL:
+            _article_cache.move_to_end(key)
+            _cache_counters["hits"] += 1
+            return [dict(row) for row in entry[2]]
+        _cache_counters["misses"] += 1
+
+    rows = _query_articles(**kwargs)
+    with _cache_lock:
+        # A scrape that committed mid-query bumped the generation: don't cache
+        if generation == _cache_generation:
+            _article_cache[key] = (generation, now, rows)
+            _article_cache.move_to_end(key)
+            while len(_article_cache) > ARTICLE_CACHE_SIZE:
+                _article_cache.popitem(last=False)
+    return [dict(row) for row in rows]
+
+
+def _query_articles(**filters):
+    conn = acquire_connection()
+    try:
+        return _select_articles(conn, **filters)
+    finally:
+        release_connection(conn)
+
+
+def _select_articles(conn, category, source, search, topic, country, time_range, date_to,
+                     limit, free_only, locale, sort, after, collapse_stories):
     ph     = "%s" if USE_POSTGRES else "?"
 
     if not USE_POSTGRES:
         conn.row_factory = sqlite3.Row
 
     cursor = conn.cursor()
-    query  = "SELECT * FROM articles WHERE 1=1"
-    params = []
+    join, rank = "", None
+    if search:
+        join, search_where, search_params, rank = _search_clause(cursor, search, locale)
+
+    query  = f" FROM articles{join} WHERE 1=1"
+    params = list(search_params) if search and join else []
 
-    if category:
+    if category in TOPIC_BITS:
+        query += f" AND (category = {ph} OR (topic_mask & {ph}) <> 0)"
+        params += [category, TOPIC_BITS[category]]
+    elif category:
         query += f" AND (category = {ph} OR tags LIKE {ph})"
         params += [category, f"%{category}%"]
     if source:
@@ -1149,14 +3352,26 @@ def get_all_articles(category=None, source=None, search=None, topic=None,
     if country:
         query += f" AND country = {ph}"
         params.append(country)
-    if search:
-        query += f" AND (title LIKE {ph} OR summary LIKE {ph})"
-        params += [f"%{search}%", f"%{search}%"]
+    if locale:
+        query += f" AND locale = {ph}"
+        params.append(locale)
+    if search and not join:
+        query  += search_where
+        params += search_params
     if topic:
-        topic_list    = [t.strip() for t in topic.split(",")]
-        topic_clauses = " OR ".join([f"topics LIKE {ph}" for _ in topic_list])
-        query        += f" AND ({topic_clauses})"
-        params       += [f"%{t}%" for t in topic_list]
+        # Known taxonomy names → article_topics index; anything else keeps
+        # the old substring match so free-form callers still work.
+        known, unknown = split_taxonomy_names(topic)
+        known_ids      = [TAXONOMY_TAGS.index(t) for t in known]
+        topic_clauses = []
+        if known_ids:
+            topic_clauses.append(f"articles.id IN (SELECT article_id FROM article_topics "
+                                 f"WHERE topic_id IN ({', '.join([ph] * len(known_ids))}))")
+            params += known_ids
+        for t in unknown:
+            topic_clauses.append(f"topics LIKE {ph}")
+            params.append(f"%{t}%")
+        query += f" AND ({' OR '.join(topic_clauses)})"
     if time_range:
         query += f" AND scraped_at >= {ph}"
         params.append(time_range)
@@ -1164,11 +3379,34 @@ def get_all_articles(category=None, source=None, search=None, topic=None,
         query += f" AND scraped_at <= {ph}"
         params.append(date_to)
     if free_only:
-        query += f" AND COALESCE(paywall_override, is_paywalled) = {ph}"
-        params.append(False if USE_POSTGRES else 0)
-
-    query += f" ORDER BY scraped_at DESC LIMIT {ph}"
-    params.append(limit)
+        # Literal, not a parameter, so the planner can use idx_articles_free
+        query += f" AND COALESCE(paywall_override, is_paywalled) = {'FALSE' if USE_POSTGRES else '0'}"
+
+    if sort == "relevance" and rank:
+        if after:
+            raise ValueError("after= pages by recency; it can't be combined with sort='relevance'")
+        rank_sql, order_params = rank
+        order = f"{rank_sql}, scraped_at DESC"
+    else:
+        order, order_params = "scraped_at DESC, articles.id DESC", []
+    # Keyset: strictly below the last row of the previous page
+    keyset = " AND (scraped_at, {id}) < (%s, %s)" % (ph, ph) if after else ""
+
+    if collapse_stories:
+        # Windows run after the filters, so a story is listed as long as any
+        # member matches; keyset paging applies to the collapsed rows.
+        story = "COALESCE(articles.story_id, articles.id)"
+        query = (f"SELECT * FROM (SELECT articles.*, "
+                 f"COUNT(*) OVER (PARTITION BY {story}) AS story_size, "
+                 f"ROW_NUMBER() OVER (PARTITION BY {story} ORDER BY {order}) AS story_rank, "
+                 f"ROW_NUMBER() OVER (ORDER BY {order}) AS list_rank{query}) AS stories "
+                 f"WHERE story_rank = 1{keyset.format(id='id')} ORDER BY list_rank LIMIT {ph}")
+        params = order_params * 2 + params
+    else:
+        query   = (f"SELECT articles.*{query}{keyset.format(id='articles.id')} "
+                   f"ORDER BY {order} LIMIT {ph}")
+        params += order_params
+    params += list(after or []) + [limit]
 
     cursor.execute(query, params)
 
@@ -1177,12 +3415,297 @@ def get_all_articles(category=None, source=None, search=None, topic=None,
         rows = [dict(zip(cols, row)) for row in cursor.fetchall()]
     else:
         rows = [dict(row) for row in cursor.fetchall()]
-
-    conn.close()
+    for row in rows:
+        row["url_hash"] = url_hash_hex(row.get("url_hash"))
+        row.pop("search_vector", None)
+        row.pop("story_rank", None)
+        row.pop("list_rank", None)
     return rows
 
 
-if __name__ == "__main__":
-    print("🗞️  News Scraper Starting...\n")
+def get_articles_page(limit=50, after=None, **filters):
+    """
+    One page of get_all_articles plus the token for the next one:
+    {"articles": [...], "after": (scraped_at, id) or None}. Pass the token
+    back as after= — every page costs an index seek, however deep.
+    """
+    rows = get_all_articles(limit=limit, after=after, **filters)
+    next_after = (rows[-1]["scraped_at"], rows[-1]["id"]) if len(rows) == limit else None
+    return {"articles": rows, "after": next_after}
+
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  DAEMON  — --serve: every feed on its own schedule in one long-lived process
+#  An asyncio loop sleeps until each feed's next_due, fetches it on the fetch
+#  pool and stores it on a single writer thread, which owns the database
+#  connection. Connections, compiled classifiers, the dedup set, the story
+#  index and feed_state stay in memory between fetches.
+# ─────────────────────────────────────────────────────────────────────────────
+async def _sleep_unless_stopping(stopping, seconds):
+    """Sleep up to `seconds`; True if shutdown was requested meanwhile."""
+    import asyncio
+    try:
+        await asyncio.wait_for(stopping.wait(), timeout=max(0.0, seconds))
+        return True
+    except asyncio.TimeoutError:
+        return stopping.is_set()
+
+
+def _serve_retry_later(ctx, feed_url):
+    # Failed fetch / store: keep the validators, try again after POLL_MIN_HOURS
+    retry = datetime.now(timezone.utc) + timedelta(hours=POLL_MIN_HOURS)
+    with ctx["lock"]:
+        ctx["feed_state"][feed_url] = {**(ctx["feed_state"].get(feed_url) or {"feed_url": feed_url}),
+                                       "next_due": retry.isoformat()}
+
+
+def _serve_store(ctx, source_name, feed_info, fetched):
+    """Writer thread: store one fetched feed, commit, and update the schedule."""
+    run      = ctx["run"]
+    feed_url = feed_info["url"]
+    if run["conn"] is None and not USE_SUPABASE:
+        run["conn"] = acquire_connection()
+    _store_feed(source_name, feed_info, fetched, ctx["feed_state"].get(feed_url), run)
+    metrics = run["metrics"].pop()
+    if run["conn"]:
+        if metrics["error"]:
+            # Might be the connection itself: the next feed starts on a fresh one
+            release_connection(run["conn"])
+            run["conn"] = None
+        else:
+            run["conn"].commit()
+            run["pending"] = 0
+    bump_scrape_generation()
+
+    updated, run["updated"] = run["updated"], []
+    save_feed_state(updated)
+    if not updated:
+        _serve_retry_later(ctx, feed_url)
+    # feed_state / latest are read on the event loop (/health, /metrics)
+    with ctx["lock"]:
+        for state in updated:
+            ctx["feed_state"][state["feed_url"]] = state
+        ctx["latest"][source_name] = metrics
+        ctx["fetches"]  += 1
+        ctx["stored_at"] = time.time()
+
+
+def _serve_purge(ctx):
+    """Writer thread: retention purge, then drop purged rows from the in-memory indexes."""
+    try:
+        purge_expired()
+    except Exception as e:
+        print(f"⚠️  Purge failed (non-fatal): {e}", flush=True)
+        return
+    ctx["run"]["known"]   = load_known_hashes()
+    ctx["run"]["stories"] = load_story_index()
+
+
+def _serve_close(ctx):
+    conn = ctx["run"]["conn"]
+    if conn:
+        conn.commit()
+        release_connection(conn)
+        ctx["run"]["conn"] = None
+
+
+async def _serve_feed(ctx, source_name, feed_info):
+    import asyncio
+    loop     = asyncio.get_running_loop()
+    feed_url = feed_info["url"]
+    host     = urllib.parse.urlparse(feed_url).hostname or ""
+    slot     = ctx["host_slots"].setdefault(host, threading.BoundedSemaphore(max(1, FETCH_PER_HOST)))
+    while True:
+        next_due = _parse_timestamp((ctx["feed_state"].get(feed_url) or {}).get("next_due"))
+        delay    = (next_due - datetime.now(timezone.utc)).total_seconds() if next_due else 0.0
+        if await _sleep_unless_stopping(ctx["stopping"], delay):
+            return
+        try:
+            fetched = ctx["fetch_pool"].submit(_fetch_feed, feed_url, slot,
+                                               ctx["feed_state"].get(feed_url))
+            try:
+                await asyncio.wrap_future(fetched)
+            except Exception:
+                pass    # reported by _store_feed
+            await loop.run_in_executor(ctx["store_pool"], _serve_store,
+                                       ctx, source_name, feed_info, fetched)
+        except Exception as e:
+            print(f"     ❌  {source_name}: {e}", flush=True)
+            _serve_retry_later(ctx, feed_url)
+
+
+async def _serve_retention(ctx):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    while not await _sleep_unless_stopping(ctx["stopping"], RETENTION_EVERY_HOURS * 3600):
+        await loop.run_in_executor(ctx["store_pool"], _serve_purge, ctx)
+
+
+def serve_health(ctx):
+    """The /health payload: liveness plus a few counters from the running daemon."""
+    with ctx["lock"]:
+        states = list(ctx["feed_state"].values())
+        latest = list(ctx["latest"].values())
+    next_due = [_parse_timestamp(state.get("next_due")) for state in states]
+    next_due = min((due for due in next_due if due), default=None)
+    return {
+        "status":         "stopping" if ctx["stopping"].is_set() else "ok",
+        "backend":        backend_name(),
+        "uptime_seconds": round(time.time() - ctx["started_at"]),
+        "feeds":          len(FEEDS),
+        "feeds_failing":  sum(1 for m in latest if m["error"]),
+        "fetches":        ctx["fetches"],
+        "articles_saved": ctx["run"]["total_new"],
+        "last_stored_at": ctx["stored_at"],
+        "next_due":       next_due.isoformat() if next_due else None,
+    }
+
+
+async def _serve_http(ctx, reader, writer):
+    """Minimal HTTP/1.1: GET /health (JSON) and GET /metrics (Prometheus text)."""
+    import asyncio
+    try:
+        request = await asyncio.wait_for(reader.readline(), timeout=5)
+        while await asyncio.wait_for(reader.readline(), timeout=5) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request.decode("latin-1").split()
+        path  = parts[1].split("?")[0] if len(parts) > 1 else "/"
+        if path == "/health":
+            health = serve_health(ctx)
+            status = "200 OK" if health["status"] == "ok" else "503 Service Unavailable"
+            ctype, body = "application/json", json.dumps(health).encode()
+        elif path == "/metrics":
+            with ctx["lock"]:
+                latest = list(ctx["latest"].values())
+            status = "200 OK"
+            ctype  = "text/plain; version=0.0.4"
+            body   = prometheus_text(latest, summarize_metrics(latest), ctx["stored_at"]).encode()
+        else:
+            status, ctype, body = "404 Not Found", "text/plain", b"not found\n"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve(host=SERVE_HOST, port=SERVE_PORT, workers=FETCH_WORKERS):
+    """
+    Run until SIGTERM / SIGINT: each feed is fetched whenever its adaptive
+    schedule says it is due, the retention purge runs every
+    RETENTION_EVERY_HOURS, and http://host:port/health and /metrics report on
+    the daemon. On shutdown, in-flight feeds are finished and committed.
+    """
+    import asyncio
+    import signal
+    from concurrent.futures import ThreadPoolExecutor
+
     setup_database()
-    scrape_all_feeds()
+    for locale in LOCALE_TABLES:
+        _tables(locale)
+    ctx = {
+        "run": {
+            "total_new": 0, "unchanged": 0, "bytes_saved": 0, "bytes_read": 0, "updated": [],
+            "known": load_known_hashes(), "already_stored": 0, "stories": load_story_index(),
+            "conn": None, "pending": 0, "metrics": [],
+        },
+        "feed_state": load_feed_state(), "latest": {}, "host_slots": {},
+        "fetches": 0, "stored_at": None, "started_at": time.time(), "lock": threading.Lock(),
+        "fetch_pool": ThreadPoolExecutor(max_workers=max(1, workers)),
+        # One writer thread: SQLite connections are thread-bound, and stores
+        # stay in the same order as a single scrape would do them
+        "store_pool": ThreadPoolExecutor(max_workers=1),
+    }
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        ctx["stopping"] = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, ctx["stopping"].set)
+            except NotImplementedError:     # Windows: Ctrl+C raises instead
+                pass
+        server = await asyncio.start_server(functools.partial(_serve_http, ctx), host, port)
+        print(f"🛰️  Serving {len(FEEDS)} feeds; health on http://{host}:{port}/health", flush=True)
+        tasks = [asyncio.create_task(_serve_feed(ctx, name, info)) for name, info in FEEDS.items()]
+        tasks.append(asyncio.create_task(_serve_retention(ctx)))
+        await ctx["stopping"].wait()
+        print("🛑 Shutting down — finishing in-flight feeds...", flush=True)
+        server.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await server.wait_closed()
+
+    try:
+        asyncio.run(main())
+    finally:
+        ctx["fetch_pool"].shutdown(wait=True)
+        ctx["store_pool"].submit(_serve_close, ctx).result()
+        ctx["store_pool"].shutdown(wait=True)
+        print(f"👋 Stopped after {ctx['fetches']} fetches, "
+              f"{ctx['run']['total_new']} new articles.", flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scrape news feeds into the articles table.")
+    parser.add_argument("--recategorize", action="store_true",
+                        help="re-tag stored articles with the current taxonomy instead of scraping")
+    parser.add_argument("--force", action="store_true",
+                        help="with --recategorize: re-tag every article, not only stale ones")
+    parser.add_argument("--rebuild-stats", action="store_true",
+                        help="recompute the article_stats rollup from articles and verify it")
+    parser.add_argument("--rekey-urls", action="store_true",
+                        help="recompute url_hash from canonical links and merge duplicates "
+                             "(needed once on Supabase, and after changing URL_QUERY_RULES)")
+    parser.add_argument("--archive-dir", default=None,
+                        help="archive expired articles here as compressed JSONL before purging "
+                             "(default: $SCRAPER_ARCHIVE_DIR; unset = no archive)")
+    parser.add_argument("--serve", action="store_true",
+                        help="run as a daemon: fetch each feed when due, purge on a timer, "
+                             "serve /health and /metrics until SIGTERM")
+    parser.add_argument("--host", default=SERVE_HOST, help=f"with --serve: listen address (default {SERVE_HOST})")
+    parser.add_argument("--port", type=int, default=SERVE_PORT,
+                        help=f"with --serve: health / metrics port (default {SERVE_PORT})")
+    parser.add_argument("--all-feeds", action="store_true",
+                        help="fetch every feed now instead of only those due per their polling schedule")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save every fetched feed (body + headers) to DIR")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="scrape from feeds saved with --record instead of the network")
+    parser.add_argument("--replay-latency", default="0", metavar="SECONDS",
+                        help='with --replay: delay per feed, or "recorded" for the original fetch time')
+    parser.add_argument("--metrics", metavar="FILE", default=None,
+                        help="append per-source stage metrics as JSON lines (default: $SCRAPER_METRICS_FILE)")
+    parser.add_argument("--prometheus", metavar="FILE", default=None,
+                        help="write run metrics in Prometheus text format (default: $SCRAPER_PROMETHEUS_FILE)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="with --recategorize: number of classifier processes (default 1)")
+    args = parser.parse_args()
+    if args.archive_dir is not None:
+        ARCHIVE_DIR = args.archive_dir
+
+    if args.serve:
+        serve(host=args.host, port=args.port)
+    elif args.recategorize:
+        print("🏷️  Recategorizing stored articles...\n")
+        setup_database()
+        recategorize_all_articles(force=args.force, workers=args.workers)
+    elif args.rekey_urls:
+        setup_database()
+        rekey_articles()
+    elif args.rebuild_stats:
+        setup_database()
+        if not rebuild_article_stats():
+            close_pool()
+            raise SystemExit(1)
+    else:
+        print("🗞️  News Scraper Starting...\n")
+        setup_database()
+        scrape_all_feeds(scheduled=not args.all_feeds, record_dir=args.record, replay_dir=args.replay,
+                         replay_latency=args.replay_latency, metrics_file=args.metrics,
+                         prometheus_file=args.prometheus)
+    close_pool()
@@ -234,3 +234,148 @@ ALTER TABLE newsletter_subscribers ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Anyone can subscribe to newsletter"
   ON newsletter_subscribers FOR INSERT
   WITH CHECK (true);
+
+
+-- ── 9. feed_state ─────────────────────────────────────────────────────────────
+-- Per-feed HTTP validators kept by the scraper for conditional GETs.
+-- Service role only — no public policies.
+
+CREATE TABLE IF NOT EXISTS feed_state (
+  feed_url       TEXT PRIMARY KEY,
+  etag           TEXT,
+  last_modified  TEXT,
+  content_length INTEGER DEFAULT 0,
+  checked_at     TIMESTAMPTZ
+);
+
+ALTER TABLE feed_state ENABLE ROW LEVEL SECURITY;
+
+
+-- ── Migrations for existing deployments ──────────────────────────────────────
+-- Columns added to articles after the initial schema. Safe to re-run.
+
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS taxonomy_version TEXT DEFAULT '';
+
+-- Full-text search: german / english config chosen by locale, GIN-indexed
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+  GENERATED ALWAYS AS (to_tsvector(
+    CASE WHEN locale = 'de' THEN 'german'::regconfig ELSE 'english'::regconfig END,
+    coalesce(title, '') || ' ' || coalesce(summary, ''))) STORED;
+CREATE INDEX IF NOT EXISTS idx_articles_search ON articles USING GIN (search_vector);
+
+-- Bitmask of the article's system topics + identity tags (see TOPIC_BITS in the scraper)
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS topic_mask INTEGER;
+
+-- Listing indexes: filter column + (scraped_at, id) keyset order
+CREATE INDEX IF NOT EXISTS idx_articles_scraped ON articles (scraped_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_source  ON articles (source, scraped_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_country ON articles (country, scraped_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_locale  ON articles (locale, scraped_at, id);
+CREATE INDEX IF NOT EXISTS idx_articles_free    ON articles (scraped_at, id)
+  WHERE COALESCE(paywall_override, is_paywalled) = FALSE;
+
+-- Topic ids = bit positions in articles.topic_mask (TAXONOMY_TAGS in the scraper)
+CREATE TABLE IF NOT EXISTS topic_ids (
+  id   INTEGER PRIMARY KEY,
+  name TEXT NOT NULL
+);
+INSERT INTO topic_ids (id, name) VALUES
+  (0, 'Anti-Rights & Backlash Movements'),
+  (1, 'Bodily Autonomy & Reproductive Justice'),
+  (2, 'Violence, Safety & Criminal Justice'),
+  (3, 'State Power, Law & Governance'),
+  (4, 'Economic & Labour Justice'),
+  (5, 'Migration, Borders & Citizenship'),
+  (6, 'Climate & Environmental Justice'),
+  (7, 'Technology & Digital Power'),
+  (8, 'Culture, Media & Narrative Power'),
+  (9, 'women'),
+  (10, 'lgbtqia+')
+ON CONFLICT (id) DO UPDATE SET name = excluded.name;
+ALTER TABLE topic_ids ENABLE ROW LEVEL SECURITY;
+
+-- article_stats: per-day counts by dimension (all / source / country / locale
+-- / topic), kept in step with articles by trigger so stats never scan articles.
+CREATE TABLE IF NOT EXISTS article_stats (
+  day       TEXT    NOT NULL,
+  dimension TEXT    NOT NULL,
+  value     TEXT    NOT NULL,
+  articles  INTEGER NOT NULL DEFAULT 0,
+  paywalled INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (day, dimension, value)
+);
+ALTER TABLE article_stats ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Article stats are publicly readable" ON article_stats;
+CREATE POLICY "Article stats are publicly readable"
+  ON article_stats FOR SELECT
+  USING (true);
+
+CREATE OR REPLACE FUNCTION article_stats_apply(a articles, delta INTEGER)
+RETURNS void LANGUAGE sql AS $$
+  INSERT INTO article_stats (day, dimension, value, articles, paywalled)
+  SELECT to_char(a.scraped_at AT TIME ZONE 'UTC', 'YYYY-MM-DD'), d.dimension, d.value, delta,
+         CASE WHEN COALESCE(a.paywall_override, a.is_paywalled) THEN delta ELSE 0 END
+    FROM (
+      VALUES ('all', ''), ('source', COALESCE(a.source, '')),
+             ('country', COALESCE(a.country, '')), ('locale', COALESCE(a.locale, ''))
+      UNION ALL
+      SELECT 'topic', t.name FROM topic_ids t
+       WHERE (COALESCE(a.topic_mask, 0) & (1 << t.id)) <> 0
+    ) AS d(dimension, value)
+  ON CONFLICT (day, dimension, value) DO UPDATE
+     SET articles  = article_stats.articles  + excluded.articles,
+         paywalled = article_stats.paywalled + excluded.paywalled;
+$$;
+
+CREATE OR REPLACE FUNCTION article_stats_trigger()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM article_stats_apply(OLD, -1);
+    DELETE FROM article_stats
+     WHERE day = to_char(OLD.scraped_at AT TIME ZONE 'UTC', 'YYYY-MM-DD') AND articles <= 0;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM article_stats_apply(NEW, 1);
+  END IF;
+  RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS articles_maintain_stats ON articles;
+CREATE TRIGGER articles_maintain_stats
+  AFTER INSERT OR DELETE OR UPDATE OF scraped_at, source, country, locale, topic_mask,
+                                      is_paywalled, paywall_override
+  ON articles FOR EACH ROW EXECUTE FUNCTION article_stats_trigger();
+
+-- Recompute from scratch (scraper_UPDATED.py --rebuild-stats calls this via RPC).
+-- Only the scraper's service role may run it: it rewrites the whole table.
+CREATE OR REPLACE FUNCTION rebuild_article_stats()
+RETURNS void LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public, pg_temp AS $$
+BEGIN
+  DELETE FROM article_stats;
+  PERFORM article_stats_apply(a, 1) FROM articles a;
+END $$;
+
+REVOKE EXECUTE ON FUNCTION rebuild_article_stats() FROM PUBLIC, anon, authenticated;
+GRANT  EXECUTE ON FUNCTION rebuild_article_stats() TO service_role;
+
+-- Near-duplicate stories: 64-bit SimHash of the normalized title + summary,
+-- and the story it belongs to (the SimHash of the story's first article).
+-- Existing rows are signed and clustered by the scraper's SQLite / Postgres
+-- setup; on Supabase they stay NULL (each row its own story) until purged.
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS simhash  BIGINT;
+ALTER TABLE articles ADD COLUMN IF NOT EXISTS story_id BIGINT;
+
+-- url_hash is now the hex BLAKE2b-128 of the canonicalized link (tracking
+-- parameters, scheme, www./amp. and trailing slashes normalized). It stays
+-- TEXT here, since PostgREST exchanges bytea as hex text anyway. Re-key
+-- existing rows once, merging any duplicates found, before the next scrape:
+--   python scraper/scraper_UPDATED.py --rekey-urls
+
+-- Adaptive polling schedule per feed (see schedule_feed in the scraper)
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS newest_entry TIMESTAMPTZ;
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS entries      INTEGER DEFAULT 0;
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS new_entries  INTEGER DEFAULT 0;
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS entry_rate   REAL;
+ALTER TABLE feed_state ADD COLUMN IF NOT EXISTS next_due     TIMESTAMPTZ;